@@ -1,11 +1,103 @@
 from django.contrib import admin
-from django.utils.safestring import mark_safe
+from django.contrib.admin.views.main import ChangeList
+from django.db import transaction
+from django.utils.html import format_html
+from django.utils.text import Truncator
 
+from .blog_constants import ADMIN_TEXT_LENGTH
+from .caching import bump_version
 from .models import Category, Location, Post, Comment
+from .search import match_posts
+from .thumbnails import get_thumbnail_url
+
+
+def get_selected(queryset):
+    return queryset.model.objects.filter(pk__in=queryset.values('pk'))
+
+
+class InputFilter(admin.SimpleListFilter):
+    template = 'admin/input_filter.html'
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        return ((None, None),)
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.lookup: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        all_choice = next(super().choices(changelist))
+        all_choice['query_parts'] = (
+            (key, value)
+            for key, value in changelist.get_filters_params().items()
+            if key != self.parameter_name
+        )
+        yield all_choice
+
+
+class AuthorFilter(InputFilter):
+    title = 'имени автора'
+    parameter_name = 'author'
+    lookup = 'author__username'
+
+
+class PostFilter(InputFilter):
+    title = 'номеру поста'
+    parameter_name = 'post'
+    lookup = 'post_id'
+
+
+class LocationFilter(InputFilter):
+    title = 'названию места'
+    parameter_name = 'location'
+    lookup = 'location__name'
+
+
+class CategoryFilter(InputFilter):
+    title = 'идентификатору категории'
+    parameter_name = 'category'
+    lookup = 'category__slug'
+
+
+class DeferredChangeList(ChangeList):
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(
+            *self.model_admin.changelist_defer
+        )
+
+
+class DeferredChangeListMixin:
+    changelist_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        return DeferredChangeList
+
+
+class PublishActionsMixin:
+    actions = ('publish', 'unpublish')
+
+    def set_published(self, request, queryset, is_published):
+        with transaction.atomic():
+            updated = get_selected(queryset).set_published(is_published)
+        self.message_user(
+            request,
+            f'{"Опубликовано" if is_published else "Снято с публикации"}: '
+            f'{updated}.'
+        )
+
+    @admin.action(description='Опубликовать выбранные записи')
+    def publish(self, request, queryset):
+        self.set_published(request, queryset, True)
+
+    @admin.action(description='Снять с публикации выбранные записи')
+    def unpublish(self, request, queryset):
+        self.set_published(request, queryset, False)
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'description',
@@ -22,7 +114,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PublishActionsMixin, admin.ModelAdmin):
     list_display = (
         'name',
         'is_published',
@@ -36,51 +128,115 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    PublishActionsMixin, DeferredChangeListMixin, admin.ModelAdmin
+):
     list_display = (
         'title',
-        'text',
+        'short_text',
         'pub_date',
         'author',
         'location',
         'category',
         'is_published',
         'created_at',
-        'image',
         'picture_display',
     )
     list_editable = (
         'is_published',
     )
-    search_fields = (
-        'title',
-        'pub_date',
+    list_select_related = (
         'author',
         'location',
         'category'
     )
+    search_fields = ('title',)
     list_filter = (
         'is_published',
         'pub_date',
+        AuthorFilter,
+        LocationFilter,
+        CategoryFilter,
+        'created_at'
+    )
+    autocomplete_fields = (
         'author',
         'location',
-        'category',
-        'created_at'
+        'category'
     )
+    show_full_result_count = False
+    changelist_defer = ('text', 'rendered_html')
+    actions = ('publish', 'unpublish', 'unpublish_authors')
+
+    @admin.display(description='Текст')
+    def short_text(self, obj):
+        return obj.excerpt
 
+    @admin.display(description='Превью')
     def picture_display(self, obj):
-        if obj.image:
-            return mark_safe(f'(<img src={obj.image.url} width="80" height="60">')
+        if not obj.image:
+            return None
+        try:
+            url = get_thumbnail_url(obj.image)
+        except OSError:
+            return None
+        return format_html('<img src="{}">', url)
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return match_posts(queryset, search_term), False
+
+    @admin.action(description='Снять с публикации все посты их авторов')
+    def unpublish_authors(self, request, queryset):
+        self.set_published(
+            request,
+            Post.objects.filter(
+                author__in=get_selected(queryset).values('author')
+            ),
+            False
+        )
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(DeferredChangeListMixin, admin.ModelAdmin):
     list_display = (
-        'text',
+        'short_text',
         'post',
         'created_at',
         'author',
     )
+    list_select_related = (
+        'post',
+        'author'
+    )
+    search_fields = ('=author__username',)
+    list_filter = (
+        'created_at',
+        AuthorFilter,
+        PostFilter
+    )
+    autocomplete_fields = (
+        'post',
+        'author'
+    )
+    ordering = ('-id',)
+    show_full_result_count = False
+    changelist_defer = ('post__text', 'post__rendered_html')
+    actions = ('delete_authors_comments',)
+
+    @admin.display(description='Комментарий')
+    def short_text(self, obj):
+        return Truncator(obj.text).chars(ADMIN_TEXT_LENGTH)
+
+    def delete_queryset(self, request, queryset):
+        get_selected(queryset).delete_and_recount()
+        bump_version('posts')
 
-    search_fields = list_display
-    list_filter = list_display
+    @admin.action(description='Удалить все комментарии их авторов')
+    def delete_authors_comments(self, request, queryset):
+        deleted = Comment.objects.filter(
+            author__in=get_selected(queryset).values('author')
+        ).delete_and_recount()
+        bump_version('posts')
+        self.message_user(request, f'Удалено комментариев: {deleted}.')
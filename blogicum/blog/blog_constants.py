@@ -1,3 +1,8 @@
 FIELD_LENGTH = 256
 TRUNCATED_MODEL_NAME = 21
 INDEX_POSTS_LIMITER = 10
+EXCERPT_WORDS = 10
+WORDS_PER_MINUTE = 200
+THUMBNAIL_SIZE = (80, 60)
+ADMIN_TEXT_LENGTH = 50
+QUERY_STATS_LIMIT = 50
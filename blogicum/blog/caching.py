@@ -0,0 +1,49 @@
+from contextvars import ContextVar
+from uuid import uuid4
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = 'blog:version:{}'
+
+used_versions = ContextVar('blog_used_versions', default=None)
+
+
+def is_shared():
+    # Версии меняют сигналы в одном процессе, а читают их все остальные.
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache)
+
+
+def remember(versions):
+    used = used_versions.get()
+    if used is not None:
+        used.update(versions)
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    remember({name: version})
+    return version
+
+
+def bump_version(*names):
+    cache.set_many(
+        {VERSION_KEY.format(name): uuid4().hex for name in names}, None
+    )
+
+
+def get_versions(names):
+    keys = {name: VERSION_KEY.format(name) for name in names}
+    versions = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    versions = {name: versions[key] for name, key in keys.items()}
+    remember(versions)
+    return versions
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import models
+
+recount_suppressed = ContextVar('blog_recount_suppressed', default=False)
+
+
+def cascade_uncounted(collector, field, sub_objs, using):
+    # Счётчики и фрагменты удаляемых каскадом комментариев обновляются
+    # одним запросом на уровне публикации или автора.
+    models.CASCADE(collector, field, sub_objs, using)
+    for obj in sub_objs:
+        obj._deleted_by_cascade = True
+
+
+@contextmanager
+def suppress_recount():
+    token = recount_suppressed.set(True)
+    try:
+        yield
+    finally:
+        recount_suppressed.reset(token)
+
+
+def is_recounted(comment):
+    return not (
+        recount_suppressed.get()
+        or getattr(comment, '_deleted_by_cascade', False)
+    )
@@ -0,0 +1,146 @@
+from functools import lru_cache
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from . import metrics, rendering
+from .caching import bump_version, get_version, get_versions, is_shared
+
+TEMPLATES = {
+    'card': 'includes/post_card.html',
+    'header': 'includes/header.html',
+    'comments': 'includes/comment_list.html',
+}
+FRAGMENT_KEY = 'blog:fragment:{}:{}:{}'
+USERNAMES = 'usernames'
+
+
+@lru_cache(maxsize=None)
+def get_template_version(kind):
+    source = get_template(TEMPLATES[kind]).template.source
+    return md5(source.encode()).hexdigest()
+
+
+def get_name(kind, pk):
+    return f'{kind}:{pk}'
+
+
+def invalidate(kind, pks):
+    names = [get_name(kind, pk) for pk in pks]
+    if names:
+        bump_version(*names)
+
+
+def invalidate_lists(lists):
+    invalidate(
+        'category_posts', {category for category, _ in lists if category}
+    )
+    invalidate('author_posts', {author for _, author in lists})
+
+
+def get_key(kind, *parts):
+    return FRAGMENT_KEY.format(
+        kind, get_template_version(kind), ':'.join(map(str, parts))
+    )
+
+
+def count(kind, hit):
+    metrics.inc('blogicum_cache_requests_total', (
+        ('cache', f'fragment_{kind}'),
+        ('result', 'hit' if hit else 'miss'),
+    ))
+
+
+def get_cached(keys):
+    return cache.get_many(keys) if is_shared() else {}
+
+
+def store(fragments):
+    if fragments and is_shared():
+        cache.set_many(
+            fragments, getattr(settings, 'BLOG_FRAGMENT_TIMEOUT', 86400)
+        )
+
+
+def render(kind, key, context):
+    html = get_cached([key]).get(key)
+    count(kind, html is not None)
+    if html is None:
+        html = get_template(TEMPLATES[kind]).render(context)
+        store({key: html})
+    return mark_safe(html)
+
+
+def get_card_names(post):
+    return (
+        get_name('post', post.pk),
+        get_name('user', post.author_id),
+        get_name('category', post.category_id),
+        get_name('location', post.location_id),
+        get_name('comments', post.pk),
+    )
+
+
+def render_cards(posts):
+    posts = list(posts)
+    cacheable = [
+        post for post in posts
+        if not getattr(post, 'title_highlight', None)
+        and not getattr(post, 'text_snippet', None)
+    ]
+    versions = get_versions({
+        name for post in cacheable for name in get_card_names(post)
+    })
+    keys = {
+        post.pk: get_key(
+            'card', post.pk, post.comment_count,
+            *(versions[name] for name in get_card_names(post))
+        )
+        for post in cacheable
+    }
+    cached = get_cached(keys.values())
+    rendering.refresh(
+        [post for post in cacheable if keys[post.pk] not in cached], 'card'
+    )
+    template = get_template(TEMPLATES['card'])
+    missing = {}
+    cards = []
+    for post in posts:
+        key = keys.get(post.pk)
+        html = cached.get(key)
+        if key is not None:
+            count('card', html is not None)
+        if html is None:
+            html = template.render({'post': post})
+            if key is not None:
+                missing[key] = html
+        cards.append((post, mark_safe(html)))
+    store(missing)
+    return cards
+
+
+def render_header(request, user):
+    view_name = getattr(
+        getattr(request, 'resolver_match', None), 'view_name', None
+    )
+    version = user.is_authenticated and get_version(get_name('user', user.pk))
+    return render(
+        'header',
+        get_key('header', view_name, user.pk, version),
+        {'request': request, 'user': user}
+    )
+
+
+def render_comments(post, page_obj, user):
+    return render(
+        'comments',
+        get_key(
+            'comments', post.pk,
+            *get_versions((get_name('comments', post.pk), USERNAMES)).values(),
+            page_obj.number, user.pk
+        ),
+        {'post': post, 'page_obj': page_obj, 'user': user}
+    )
@@ -0,0 +1,96 @@
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from django.db import connections
+from django.template.base import Template
+
+
+@dataclass
+class Timings:
+    sql_count: int = 0
+    sql_time: float = 0
+    template_time: float = 0
+    template_sql_time: float = 0
+    template_depth: int = 0
+    sql: list = field(default_factory=list)
+    includes: dict = field(default_factory=dict)
+
+    def merge(self, other):
+        self.sql_count += other.sql_count
+        self.sql_time += other.sql_time
+        self.template_time += other.template_time
+        self.template_sql_time += other.template_sql_time
+        self.sql.extend(other.sql)
+        for name, (count, elapsed) in other.includes.items():
+            self.add_include(name, elapsed, count)
+
+    def add_include(self, name, elapsed, count=1):
+        total_count, total_elapsed = self.includes.get(name, (0, 0))
+        self.includes[name] = (total_count + count, total_elapsed + elapsed)
+
+
+current_timings = ContextVar('blog_timings', default=None)
+
+
+def time_sql(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = perf_counter() - started
+        timings.sql_count += 1
+        timings.sql_time += elapsed
+        timings.sql.append(sql)
+        if timings.template_depth:
+            timings.template_sql_time += elapsed
+
+
+def time_template(render):
+    def timed_render(self, context):
+        timings = current_timings.get()
+        if timings is None:
+            return render(self, context)
+        timings.template_depth += 1
+        started = perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            timings.template_depth -= 1
+            elapsed = perf_counter() - started
+            if timings.template_depth:
+                timings.add_include(self.name or '<string>', elapsed)
+            else:
+                timings.template_time += elapsed
+
+    timed_render.is_timed = True
+    return timed_render
+
+
+def install_template_timing():
+    if not getattr(Template.render, 'is_timed', False):
+        Template.render = time_template(Template.render)
+
+
+@contextmanager
+def collect_timings():
+    install_template_timing()
+    parent = current_timings.get()
+    timings = Timings(template_depth=parent.template_depth if parent else 0)
+    token = current_timings.set(timings)
+    try:
+        with ExitStack() as stack:
+            if parent is None:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(time_sql)
+                    )
+            yield timings
+    finally:
+        current_timings.reset(token)
+        if parent is not None:
+            parent.merge(timings)
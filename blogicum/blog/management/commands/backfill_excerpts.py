@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, fill_excerpts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает отрывки и время чтения публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько публикаций обновлять за один запрос.'
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        for last_id in fill_excerpts(Post.objects.all(), chunk_size):
+            self.stdout.write(f'Обработано до id {last_id}')
@@ -0,0 +1,139 @@
+from statistics import median
+from time import perf_counter
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+AUTHOR_USERNAME = 'benchadmin_author'
+ADMIN_USERNAME = 'benchadmin_temporary_superuser'
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время загрузки списков публикаций и комментариев '
+            'в админке.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=0,
+            help='Сколько публикаций и комментариев должно быть в базе; '
+                 'недостающие будут созданы.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Сколько строк создавать за один запрос.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз загружать каждую страницу.'
+        )
+
+    def handle(self, *args, rows, batch_size, repeat, **options):
+        if rows:
+            author, _ = User.objects.get_or_create(username=AUTHOR_USERNAME)
+            self.fill(author, rows, batch_size)
+        post = Post.objects.order_by('-pk').first()
+        cases = (
+            ('публикации', Post, {}),
+            ('публикации, страница 100', Post, {'p': 99}),
+            ('публикации, поиск', Post, {'q': 'Публикация'}),
+            ('публикации автора', Post, {'author': AUTHOR_USERNAME}),
+            ('комментарии', Comment, {}),
+            ('комментарии к посту', Comment, {'post': post and post.pk}),
+        )
+        self.stdout.write(
+            f'Публикаций: {Post.objects.count()}, '
+            f'комментариев: {Comment.objects.count()}'
+        )
+        # Временный суперпользователь нужен только на время замеров.
+        user, _ = User.objects.get_or_create(
+            username=ADMIN_USERNAME,
+            defaults={'is_staff': True, 'is_superuser': True}
+        )
+        try:
+            for name, model, params in cases:
+                timings, queries = self.measure(user, model, params, repeat)
+                self.stdout.write(
+                    f'{name}: медиана {median(timings):.1f} мс, '
+                    f'максимум {max(timings):.1f} мс, запросов {queries}'
+                )
+        finally:
+            user.delete()
+
+    @staticmethod
+    def measure(user, model, params, repeat):
+        model_admin = admin.site._registry[model]
+        timings = []
+        for _ in range(repeat):
+            request = RequestFactory().get('/admin/', params)
+            request.user = user
+            reset_queries()
+            with CaptureQueriesContext(connection) as context:
+                started = perf_counter()
+                model_admin.changelist_view(request).render()
+                timings.append((perf_counter() - started) * 1000)
+        return timings, len(context.captured_queries)
+
+    def fill(self, author, rows, batch_size):
+        category, _ = Category.objects.get_or_create(
+            slug='benchadmin', defaults={'title': 'Нагрузочная категория'}
+        )
+        location, _ = Location.objects.get_or_create(
+            name='Нагрузочное место'
+        )
+        published = now()
+        missing = rows - Post.objects.count()
+        for start in range(0, max(missing, 0), batch_size):
+            with transaction.atomic():
+                Post.objects.bulk_create(
+                    Post(
+                        title=f'Публикация {start + number}',
+                        text='Текст нагрузочной публикации. ' * 20,
+                        excerpt='Текст нагрузочной публикации.',
+                        pub_date=published,
+                        author=author,
+                        location=location,
+                        category=category,
+                        is_visible=True,
+                    )
+                    for number in range(min(batch_size, missing - start))
+                )
+            self.stdout.write(
+                f'Создано публикаций: {min(start + batch_size, missing)}'
+            )
+        if missing > 0:
+            call_command('rebuild_search_index', verbosity=0)
+        post_ids = list(
+            Post.objects.order_by('-pk').values_list('pk', flat=True)[:1000]
+        )
+        missing = rows - Comment.objects.count()
+        for start in range(0, max(missing, 0), batch_size):
+            with transaction.atomic():
+                Comment.objects.bulk_create(
+                    Comment(
+                        text='Нагрузочный комментарий',
+                        post_id=post_ids[number % len(post_ids)],
+                        author=author,
+                    )
+                    for number in range(min(batch_size, missing - start))
+                )
+            self.stdout.write(
+                f'Создано комментариев: {min(start + batch_size, missing)}'
+            )
+        if missing > 0:
+            Post.objects.filter(pk__in=post_ids).recount_comments()
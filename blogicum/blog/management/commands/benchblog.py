@@ -0,0 +1,205 @@
+import json
+import logging
+from statistics import median, quantiles
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from blog.instrumentation import collect_timings
+from blog.models import Comment, Post
+from blog.urls import urlpatterns as blog_urlpatterns
+from pages.urls import urlpatterns as pages_urlpatterns
+
+User = get_user_model()
+
+ROUTES = (('blog', blog_urlpatterns), ('pages', pages_urlpatterns))
+ROLES = ('anonymous', 'author', 'another_user')
+METRICS = ('p50', 'p95', 'queries', 'sql_ms', 'template_ms')
+HOST = 'localhost'
+
+
+def percentile(values, share):
+    if len(values) == 1:
+        return values[0]
+    return quantiles(values, n=100, method='inclusive')[share - 1]
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время ответа, число и время SQL-запросов и время '
+            'отрисовки шаблонов для всех страниц blog и pages.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Сколько раз запрашивать каждую страницу.'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=2,
+            help='Сколько запросов сделать до начала измерений.'
+        )
+        parser.add_argument(
+            '--output',
+            default='bench.json',
+            help='Файл, в который записываются результаты.'
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Очищать кэш перед каждым запросом, чтобы измерять '
+                 'страницы без кэша страниц и фрагментов.'
+        )
+        parser.add_argument(
+            '--compare',
+            nargs=2,
+            metavar=('BASELINE', 'CURRENT'),
+            help='Сравнить два файла с результатами вместо замеров.'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Допустимый относительный рост задержки.'
+        )
+        parser.add_argument(
+            '--min-delta',
+            type=float,
+            default=1,
+            help='Рост задержки в миллисекундах, который считается шумом.'
+        )
+
+    def handle(self, *args, requests, warmup, output, no_cache, compare,
+               threshold, min_delta, **options):
+        if compare:
+            return self.compare(*compare, threshold, min_delta)
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            results = self.run(requests, warmup, no_cache)
+        finally:
+            logger.setLevel(level)
+        with open(output, 'w', encoding='utf-8') as stream:
+            json.dump(results, stream, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Результаты записаны в {output}')
+
+    def get_objects(self):
+        post = Post.objects.visible().order_by('-comment_count').first()
+        if post is None:
+            raise CommandError(
+                'В базе нет опубликованных постов; '
+                'заполните её командой seedblog.'
+            )
+        comments = Comment.objects.filter(post=post)
+        comment = (
+            comments.filter(author=post.author_id).first()
+            or comments.first()
+        )
+        another_user = User.objects.exclude(pk=post.author_id).first()
+        kwargs = {
+            'pk': post.pk,
+            'post_id': post.pk,
+            'comment_id': comment and comment.pk,
+            'category_slug': post.category.slug,
+            'username': post.author.username,
+        }
+        return kwargs, {
+            'anonymous': None,
+            'author': post.author,
+            'another_user': another_user,
+        }
+
+    def get_urls(self, kwargs):
+        for namespace, urlpatterns in ROUTES:
+            for pattern in urlpatterns:
+                names = pattern.pattern.regex.groupindex
+                if any(kwargs.get(name) is None for name in names):
+                    continue
+                yield f'{namespace}:{pattern.name}', reverse(
+                    f'{namespace}:{pattern.name}',
+                    kwargs={name: kwargs[name] for name in names}
+                )
+
+    def run(self, requests, warmup, no_cache):
+        kwargs, users = self.get_objects()
+        # Прогоны не должны зависеть от кэша, оставшегося от предыдущих.
+        cache.clear()
+        results = {}
+        for role in ROLES:
+            client = Client(HTTP_HOST=HOST)
+            if users[role] is not None:
+                client.force_login(users[role])
+            for name, url in self.get_urls(kwargs):
+                for _ in range(warmup):
+                    client.get(url)
+                samples = []
+                for _ in range(requests):
+                    if no_cache:
+                        cache.clear()
+                    with collect_timings() as timings:
+                        started = perf_counter()
+                        response = client.get(url)
+                        elapsed = perf_counter() - started
+                    samples.append((elapsed, timings))
+                latencies = [elapsed * 1000 for elapsed, _ in samples]
+                result = {
+                    'url': url,
+                    'status': response.status_code,
+                    'p50': median(latencies),
+                    'p95': percentile(latencies, 95),
+                    'queries': median(
+                        timings.sql_count for _, timings in samples
+                    ),
+                    'sql_ms': median(
+                        timings.sql_time * 1000 for _, timings in samples
+                    ),
+                    'template_ms': median(
+                        timings.template_time * 1000
+                        for _, timings in samples
+                    ),
+                }
+                results[f'{role} {name}'] = result
+                self.stdout.write(
+                    f'{role:<12} {name:<22} {result["status"]} '
+                    + ' '.join(
+                        f'{metric}={result[metric]:.1f}'
+                        for metric in METRICS
+                    )
+                )
+        return results
+
+    def compare(self, baseline_path, current_path, threshold, min_delta):
+        with open(baseline_path, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        with open(current_path, encoding='utf-8') as stream:
+            current = json.load(stream)
+        regressions = []
+        for key in sorted(baseline.keys() & current.keys()):
+            before, after = baseline[key], current[key]
+            problems = [
+                f'{metric} {before[metric]:.1f} → {after[metric]:.1f}'
+                for metric in ('p50', 'p95')
+                if after[metric] > before[metric] * (1 + threshold)
+                and after[metric] - before[metric] > min_delta
+            ]
+            if after['queries'] > before['queries']:
+                problems.append(
+                    f'queries {before["queries"]} → {after["queries"]}'
+                )
+            if after['status'] != before['status']:
+                problems.append(
+                    f'status {before["status"]} → {after["status"]}'
+                )
+            if problems:
+                regressions.append(key)
+                self.stdout.write(f'{key}: {", ".join(problems)}')
+        if regressions:
+            raise CommandError(f'Найдено регрессий: {len(regressions)}')
+        self.stdout.write('Регрессий не найдено.')
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Обслуживание базы SQLite: обновляет статистику планировщика '
+            'и возвращает свободные страницы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных.'
+        )
+        parser.add_argument(
+            '--vacuum-pages',
+            type=int,
+            default=0,
+            help='Сколько свободных страниц вернуть (0 — все).'
+        )
+        parser.add_argument(
+            '--full-vacuum',
+            action='store_true',
+            help='Выполнить полный VACUUM, например для включения '
+                 'auto_vacuum на существующей базе.'
+        )
+
+    def handle(self, *args, database, vacuum_pages, full_vacuum, **options):
+        connection = connections[database]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        steps = [
+            'ANALYZE',
+            'PRAGMA optimize',
+            ('VACUUM' if full_vacuum
+             else f'PRAGMA incremental_vacuum({vacuum_pages})'),
+            'PRAGMA wal_checkpoint(TRUNCATE)',
+        ]
+        with connection.cursor() as cursor:
+            for sql in steps:
+                started = time.perf_counter()
+                cursor.execute(sql)
+                cursor.fetchall()
+                self.stdout.write(
+                    f'{sql}: {time.perf_counter() - started:.3f} с'
+                )
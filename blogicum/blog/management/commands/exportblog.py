@@ -0,0 +1,134 @@
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+from pathlib import Path
+from time import perf_counter
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+EXPORTS = {
+    'posts': (Post, 'updated_at', (
+        'id', 'title', 'text', 'pub_date', 'author_id', 'location_id',
+        'category_id', 'image', 'is_published', 'is_visible',
+        'comment_count', 'reading_time', 'created_at', 'updated_at',
+    )),
+    'comments': (Comment, 'updated_at', (
+        'id', 'post_id', 'author_id', 'text', 'created_at', 'updated_at',
+    )),
+    'categories': (Category, 'updated_at', (
+        'id', 'title', 'slug', 'description', 'is_published', 'created_at',
+        'updated_at',
+    )),
+    'locations': (Location, 'updated_at', (
+        'id', 'name', 'is_published', 'created_at', 'updated_at',
+    )),
+    'users': (User, 'date_joined', (
+        'id', 'username', 'first_name', 'last_name', 'is_active',
+        'is_staff', 'date_joined', 'last_login',
+    )),
+}
+
+
+def parse_since(value):
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(value)
+        since = datetime.combine(date, time())
+    return make_aware(since) if is_naive(since) else since
+
+
+def export(name, directory, since, chunk_size):
+    model, timestamp_field, fields = EXPORTS[name]
+    rows = model._default_manager.order_by('pk')
+    if since is not None:
+        rows = rows.filter(**{f'{timestamp_field}__gte': since})
+    path = Path(directory) / f'{name}.jsonl.gz'
+    partial_path = path.with_name(f'{path.name}.part')
+    started = perf_counter()
+    count = 0
+    with gzip.open(partial_path, 'wt', encoding='utf-8') as stream:
+        for row in rows.values(*fields).iterator(chunk_size=chunk_size):
+            stream.write(
+                json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+            )
+            stream.write('\n')
+            count += 1
+    os.replace(partial_path, path)
+    return name, count, perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = ('Выгружает публикации, комментарии, категории, местоположения '
+            'и пользователей в сжатые файлы JSON Lines.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default='.',
+            help='Каталог, в который записываются файлы.'
+        )
+        parser.add_argument(
+            '--since',
+            help='Выгрузить только записи, созданные или изменённые '
+                 'начиная с этой даты или момента (ISO 8601).'
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=list(EXPORTS),
+            help='Выгрузить только указанные таблицы.'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Сколько таблиц выгружать параллельно, '
+                 'каждую в своём процессе.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за раз.'
+        )
+
+    def handle(self, *args, output_dir, since, only, jobs, chunk_size,
+               **options):
+        try:
+            since = since and parse_since(since)
+        except ValueError:
+            raise CommandError(f'Некорректная дата в --since: {since}')
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        started_at = now()
+        tasks = [
+            (name, output_dir, since, chunk_size) for name in only or EXPORTS
+        ]
+        if jobs > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=jobs, initializer=django.setup
+            ) as executor:
+                results = list(executor.map(export, *zip(*tasks)))
+        else:
+            results = [export(*task) for task in tasks]
+        for name, count, elapsed in results:
+            self.stdout.write(
+                f'{name}: {count} строк за {elapsed:.1f} с'
+            )
+        self.stdout.write(
+            f'Для следующей выгрузки: --since {started_at.isoformat()}'
+        )
@@ -0,0 +1,215 @@
+import gzip
+import json
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from blog.caching import bump_version
+from blog.models import (Comment, Post, TimestampedModel, get_excerpt,
+                         get_reading_time)
+from blog.search import has_search_table
+
+READ_SIZE = 1 << 20
+
+
+def skip_separators(buffer, position, started):
+    while position < len(buffer) and (
+        buffer[position].isspace() or buffer[position] in ',['
+    ):
+        if buffer[position] == '[':
+            started = True
+        position += 1
+    return position, started
+
+
+def decode_items(decoder, buffer, started, is_last):
+    items = []
+    position = 0
+    while True:
+        position, started = skip_separators(buffer, position, started)
+        if position < len(buffer) and buffer[position] == ']':
+            return items, position, started, True
+        if not started or position == len(buffer):
+            return items, position, started, False
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            if is_last:
+                raise DeserializationError(error) from error
+            return items, position, started, False
+        items.append(item)
+
+
+def iter_json_array(stream):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    while True:
+        chunk = stream.read(READ_SIZE)
+        buffer += chunk
+        items, position, started, finished = decode_items(
+            decoder, buffer, started, not chunk
+        )
+        yield from items
+        if finished:
+            return
+        if not chunk:
+            raise DeserializationError('Файл обрывается посреди массива.')
+        buffer = buffer[position:]
+
+
+def get_model_depths(models):
+    depths = {}
+
+    def depth(model, seen=()):
+        if model not in depths:
+            depths[model] = 1 + max((
+                depth(field.related_model, (*seen, model))
+                for field in model._meta.concrete_fields
+                if field.many_to_one
+                and field.related_model in models
+                and field.related_model not in (*seen, model)
+            ), default=0)
+        return depths[model]
+
+    return {model: depth(model) for model in models}
+
+
+@contextmanager
+def raw_timestamps(model):
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    flags = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = ('Потоково загружает дамп в формате dumpdata (JSON) пачками '
+            'через bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к .json или .json.gz.')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько объектов одной модели вставлять за один запрос.'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных, в которую загружается дамп.'
+        )
+        parser.add_argument(
+            '-e', '--exclude',
+            action='append',
+            default=[],
+            help='Пропустить приложение или модель (app_label.ModelName).'
+        )
+
+    def handle(self, *args, fixture, batch_size, database, exclude,
+               **options):
+        self.batch_size = batch_size
+        self.using = database
+        self.exclude = {label.lower() for label in exclude}
+        self.buffers = {}
+        self.m2m = []
+        self.loaded = {}
+        self.started = perf_counter()
+        connection = connections[database]
+        opener = gzip.open if fixture.endswith('.gz') else open
+        with ExitStack() as stack:
+            stream = stack.enter_context(
+                opener(fixture, 'rt', encoding='utf-8')
+            )
+            stack.enter_context(connection.constraint_checks_disabled())
+            objects = Deserializer(
+                (item for item in iter_json_array(stream)
+                 if not self.is_excluded(item['model'])),
+                using=database,
+                ignorenonexistent=True,
+            )
+            for deserialized in objects:
+                self.add(deserialized)
+            self.flush()
+        table_names = [model._meta.db_table for model in self.loaded]
+        connection.check_constraints(table_names=table_names)
+        self.finish(connection)
+        total = sum(self.loaded.values())
+        elapsed = perf_counter() - self.started
+        self.stdout.write(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.0f} в секунду)'
+        )
+
+    def is_excluded(self, label):
+        label = label.lower()
+        return label in self.exclude or label.split('.')[0] in self.exclude
+
+    def add(self, deserialized):
+        obj = deserialized.object
+        if isinstance(obj, Post):
+            obj.excerpt = get_excerpt(obj.text)
+            obj.reading_time = get_reading_time(obj.text)
+        if isinstance(obj, TimestampedModel) and obj.updated_at is None:
+            obj.updated_at = obj.created_at
+        buffer = self.buffers.setdefault(type(obj), [])
+        buffer.append(obj)
+        if any(deserialized.m2m_data.values()):
+            self.m2m.append(deserialized)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        depths = get_model_depths(self.buffers)
+        with transaction.atomic(using=self.using):
+            for model in sorted(self.buffers, key=depths.get):
+                objects = self.buffers[model]
+                with raw_timestamps(model):
+                    model._base_manager.using(self.using).bulk_create(
+                        objects, batch_size=self.batch_size
+                    )
+                self.loaded[model] = self.loaded.get(model, 0) + len(objects)
+            for deserialized in self.m2m:
+                for name, values in deserialized.m2m_data.items():
+                    getattr(deserialized.object, name).set(values)
+        self.buffers = {}
+        self.m2m = []
+        total = sum(self.loaded.values())
+        elapsed = perf_counter() - self.started
+        self.stdout.write(
+            f'Загружено объектов: {total} '
+            f'({total / elapsed if elapsed else 0:.0f} в секунду)'
+        )
+
+    def finish(self, connection):
+        sequence_sql = connection.ops.sequence_reset_sql(
+            no_style(), list(self.loaded)
+        )
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for line in sequence_sql:
+                    cursor.execute(line)
+        if Post not in self.loaded and Comment not in self.loaded:
+            return
+        posts = Post.objects.using(self.using)
+        posts.refresh_visibility()
+        posts.recount_comments()
+        if Post in self.loaded and has_search_table(connection):
+            call_command('rebuild_search_index', stdout=self.stdout)
+        bump_version('posts')
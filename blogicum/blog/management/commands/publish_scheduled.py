@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Показывает в ленте отложенные публикации, '
+            'время которых наступило.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а проверять публикации периодически.'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=60,
+            help='Пауза между проверками в секундах.'
+        )
+
+    def handle(self, *args, loop, interval, **options):
+        while True:
+            published = self.publish()
+            if published:
+                self.stdout.write(f'Опубликовано: {published}')
+            if not loop:
+                break
+            time.sleep(interval)
+
+    def publish(self):
+        return Post.objects.filter(
+            is_visible=False,
+            is_published=True,
+            pub_date__lte=now()
+        ).refresh_visibility()
@@ -0,0 +1,82 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from blog import querystats
+from blog.caching import is_shared
+
+HOST = 'localhost'
+
+
+class Command(BaseCommand):
+    help = ('Показывает самые тяжёлые SQL-запросы, сгруппированные '
+            'по отпечатку и представлению, с планами медленных запросов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Сколько запросов показать.'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=querystats.SORT_FIELDS,
+            default='total',
+            help='По какому показателю упорядочить запросы.'
+        )
+        parser.add_argument(
+            '--request',
+            action='append',
+            default=[],
+            metavar='PATH',
+            help='Перед выводом запросить страницу в этом процессе.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Сколько раз запрашивать каждую страницу из --request.'
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить статистику во всех процессах после вывода.'
+        )
+
+    def handle(self, *args, top, sort, request, repeat, reset, **options):
+        if request:
+            self.run(request, repeat)
+        if not is_shared():
+            self.stdout.write(
+                'Кэш не общий для процессов приложения: показана '
+                'статистика только этого процесса.'
+            )
+        entries = querystats.get_top(top, sort)
+        if not entries:
+            self.stdout.write('Статистика пуста.')
+        for entry in entries:
+            self.stdout.write(
+                f'{entry["count"]:>8} '
+                f'{entry["total"]:>10.2f} мс '
+                f'(ср. {entry["mean"]:.2f}, макс. {entry["max"]:.2f}) '
+                f'{entry["view"] or "—"}\n    {entry["fingerprint"]}'
+            )
+            if entry['plan']:
+                for line in entry['plan'].splitlines():
+                    self.stdout.write(f'      {line}')
+        if reset:
+            querystats.reset()
+
+    def run(self, paths, repeat):
+        client = Client(HTTP_HOST=HOST)
+        logger = logging.getLogger('django.request')
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            for path in paths:
+                for _ in range(repeat):
+                    client.get(path)
+        finally:
+            logger.setLevel(level)
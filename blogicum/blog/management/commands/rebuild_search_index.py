@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from blog.models import Post
+from blog.search import SEARCH_TABLE, get_write_connection, has_search_table
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Сколько публикаций индексировать одним запросом.'
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        connection = get_write_connection()
+        if not has_search_table(connection):
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.'
+            )
+        last_id = Post.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+        # Поиск не должен видеть частично заполненный индекс.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+                for start in range(0, last_id, chunk_size):
+                    cursor.execute(
+                        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                        'SELECT id, title, text '
+                        f'FROM {Post._meta.db_table} '
+                        'WHERE id > %s AND id <= %s',
+                        [start, start + chunk_size]
+                    )
+                    indexed_id = min(start + chunk_size, last_id)
+                    self.stdout.write(f'Проиндексировано до id {indexed_id}')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) "
+                "VALUES ('optimize')"
+            )
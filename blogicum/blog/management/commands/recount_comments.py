@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from blog.caching import bump_version
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое количество комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Сколько публикаций обновлять в одной транзакции.'
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        last_id = Post.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+        fixed = 0
+        for start in range(0, last_id, chunk_size):
+            with transaction.atomic():
+                fixed += Post.objects.filter(
+                    pk__gt=start,
+                    pk__lte=start + chunk_size
+                ).recount_comments()
+        if fixed:
+            bump_version('posts')
+        self.stdout.write(f'Исправлено публикаций: {fixed}')
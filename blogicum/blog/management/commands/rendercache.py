@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+
+from blog import rendering
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Показывает попадания в сохранённый HTML публикаций, '
+            'сбрасывает счётчики или перерисовывает HTML заново.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики попаданий и промахов.'
+        )
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Перерисовать HTML всех публикаций.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Сколько публикаций перерисовывать за один запрос.'
+        )
+
+    def handle(self, *args, reset, rebuild, chunk_size, **options):
+        if rebuild:
+            self.rebuild(chunk_size)
+        for kind, stats in rendering.get_stats().items():
+            total = stats['hits'] + stats['misses']
+            ratio = stats['hits'] / total if total else 0
+            average = stats['render_us'] / stats['renders'] / 1000 if (
+                stats['renders']
+            ) else 0
+            self.stdout.write(
+                f'{kind}: попаданий {stats["hits"]}, '
+                f'промахов {stats["misses"]} ({ratio:.1%}), '
+                f'отрисовка в среднем {average:.2f} мс'
+            )
+        if reset:
+            rendering.reset_stats()
+
+    def rebuild(self, chunk_size):
+        posts = Post.objects.select_related(
+            'author', 'location', 'category'
+        ).order_by('pk')
+        last_id = 0
+        while True:
+            chunk = list(posts.filter(pk__gt=last_id)[:chunk_size])
+            if not chunk:
+                return
+            for post in chunk:
+                rendering.render_all(post)
+            Post.objects.bulk_update(chunk, ('rendered_html',))
+            last_id = chunk[-1].pk
+            self.stdout.write(f'Обработано до id {last_id}')
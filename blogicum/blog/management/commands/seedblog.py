@@ -0,0 +1,263 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from math import gcd
+from time import perf_counter
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils.timezone import now
+
+from blog.caching import bump_version
+from blog.models import (Category, Comment, Location, Post, get_excerpt,
+                         get_reading_time)
+from blog.search import get_write_connection, has_search_table
+
+User = get_user_model()
+
+WORDS = (
+    'город утро вечер дорога море лес река дом друг книга письмо поезд '
+    'солнце дождь снег ветер сад окно улица площадь музей театр концерт '
+    'обед ужин чай кофе прогулка встреча разговор новость работа отпуск '
+    'картина фильм песня история память праздник зима весна лето осень'
+).split()
+DAYS = 3 * 365
+FUTURE_SHARE = 0.05
+HIDDEN_SHARE = 0.02
+LOCATION_SHARE = 0.7
+HIDDEN_CATEGORY_EVERY = 10
+
+
+def get_rng(seed, kind, chunk):
+    return random.Random(f'{seed}:{kind}:{chunk}')
+
+
+def skewed_index(rng, size, skew):
+    if skew == 0:
+        return rng.randrange(size)
+    if skew == 1:
+        position = (size + 1) ** rng.random()
+    else:
+        power = 1 - skew
+        position = (
+            ((size + 1) ** power - 1) * rng.random() + 1
+        ) ** (1 / power)
+    return min(int(position) - 1, size - 1)
+
+
+def scatter(index, size):
+    step = 7919
+    while gcd(step, size) != 1:
+        step += 1
+    return index * step % size
+
+
+def get_sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def seed_posts(chunk, first_id, count, options):
+    rng = get_rng(options['seed'], 'posts', chunk)
+    started = now()
+    posts = []
+    for number in range(count):
+        text = '. '.join(
+            get_sentence(rng, rng.randint(5, 15))
+            for _ in range(rng.randint(1, 30))
+        ) + '.'
+        category_index = skewed_index(
+            rng, options['categories'], options['skew']
+        )
+        is_future = rng.random() < FUTURE_SHARE
+        is_published = rng.random() >= HIDDEN_SHARE
+        pub_date = started + timedelta(
+            minutes=rng.randint(1, DAYS * 24 * 60) * (1 if is_future else -1)
+        )
+        posts.append(Post(
+            id=first_id + number,
+            title=get_sentence(rng, rng.randint(2, 6)),
+            text=text,
+            excerpt=get_excerpt(text),
+            reading_time=get_reading_time(text),
+            pub_date=pub_date,
+            is_published=is_published,
+            author_id=options['first_user'] + skewed_index(
+                rng, options['users'], options['skew']
+            ),
+            category_id=options['first_category'] + category_index,
+            location_id=options['first_location'] + rng.randrange(
+                options['locations']
+            ) if rng.random() < LOCATION_SHARE else None,
+        ))
+    with transaction.atomic():
+        Post.objects.bulk_create(posts, batch_size=options['batch_size'])
+    return count
+
+
+def seed_comments(chunk, first_id, count, options):
+    rng = get_rng(options['seed'], 'comments', chunk)
+    posts = options['posts']
+    comments = [
+        Comment(
+            id=first_id + number,
+            text=get_sentence(rng, rng.randint(3, 20)),
+            post_id=options['first_post'] + scatter(
+                skewed_index(rng, posts, options['skew']), posts
+            ),
+            author_id=options['first_user'] + skewed_index(
+                rng, options['users'], options['skew']
+            ),
+        )
+        for number in range(count)
+    ]
+    with transaction.atomic():
+        Comment.objects.bulk_create(
+            comments, batch_size=options['batch_size']
+        )
+    return count
+
+
+def get_next_id(model):
+    return (model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими пользователями, публикациями '
+            'и комментариями для нагрузочного тестирования.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--comments-per-post',
+            type=float,
+            default=10,
+            help='Среднее число комментариев на публикацию.'
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель степенного распределения авторов, категорий '
+                 'и комментариев по публикациям; 0 — равномерно.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=20000,
+            help='Сколько строк создаёт одна задача.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Сколько строк вставлять за один запрос.'
+        )
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help='Сколько процессов заполняют базу параллельно.'
+        )
+
+    def handle(self, *args, users, categories, locations, posts,
+               comments_per_post, skew, seed, chunk_size, batch_size, jobs,
+               **options):
+        for name, value in (
+            ('--users', users),
+            ('--categories', categories),
+            ('--locations', locations),
+        ):
+            if value < 1:
+                raise CommandError(f'{name} должно быть не меньше 1.')
+        options = {
+            'users': users,
+            'categories': categories,
+            'locations': locations,
+            'posts': posts,
+            'skew': skew,
+            'seed': seed,
+            'batch_size': batch_size,
+            'first_user': get_next_id(User),
+            'first_category': get_next_id(Category),
+            'first_location': get_next_id(Location),
+            'first_post': get_next_id(Post),
+        }
+        self.seed_references(options)
+        self.run('posts', seed_posts, posts, get_next_id(Post),
+                 chunk_size, jobs, options)
+        Post.objects.filter(
+            pk__gte=options['first_post']
+        ).refresh_visibility()
+        self.run('comments', seed_comments, int(posts * comments_per_post),
+                 get_next_id(Comment), chunk_size, jobs, options)
+        Post.objects.filter(pk__gte=options['first_post']).recount_comments()
+        if has_search_table(get_write_connection()):
+            call_command('rebuild_search_index', stdout=self.stdout)
+        bump_version('posts')
+
+    def seed_references(self, options):
+        rng = get_rng(options['seed'], 'references', 0)
+        password = make_password(None)
+        prefix = f's{options["seed"]}u{options["first_user"]}'
+        with transaction.atomic():
+            User.objects.bulk_create(
+                (User(
+                    id=options['first_user'] + number,
+                    username=f'{prefix}_{number}',
+                    password=password,
+                ) for number in range(options['users'])),
+                batch_size=options['batch_size']
+            )
+            Category.objects.bulk_create(
+                Category(
+                    id=options['first_category'] + number,
+                    title=get_sentence(rng, 2),
+                    slug=f'seed-{options["first_category"] + number}',
+                    is_published=number % HIDDEN_CATEGORY_EVERY != 1,
+                ) for number in range(options['categories'])
+            )
+            Location.objects.bulk_create(
+                Location(
+                    id=options['first_location'] + number,
+                    name=get_sentence(rng, 2),
+                ) for number in range(options['locations'])
+            )
+
+    def run(self, name, function, total, first_id, chunk_size, jobs,
+            options):
+        tasks = [
+            (chunk, first_id + start, min(chunk_size, total - start), options)
+            for chunk, start in enumerate(range(0, total, chunk_size))
+        ]
+        started = perf_counter()
+        created = 0
+        if not tasks:
+            return
+        if jobs > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=jobs, initializer=django.setup
+            ) as executor:
+                results = executor.map(function, *zip(*tasks))
+                for count in results:
+                    created += count
+                    self.report(name, created, started)
+        else:
+            for task in tasks:
+                created += function(*task)
+                self.report(name, created, started)
+
+    def report(self, name, created, started):
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'{name}: {created} ({created / elapsed:.0f} в секунду)'
+        )
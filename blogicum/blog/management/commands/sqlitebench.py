@@ -0,0 +1,128 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает конкурентные чтение и запись комментариев в SQLite '
+            'с настройками по умолчанию и с BLOG_SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5,
+            help='Длительность каждого прогона в секундах.'
+        )
+        parser.add_argument(
+            '--posts',
+            type=int,
+            default=1000,
+            help='Сколько публикаций создать перед прогоном.'
+        )
+
+    def handle(self, *args, readers, writers, duration, posts, **options):
+        tuned = getattr(settings, 'BLOG_SQLITE_PRAGMAS', {})
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pragmas in (('default', {}), ('tuned', tuned)):
+                path = Path(directory) / f'{name}.sqlite3'
+                self.prepare(path, pragmas, posts)
+                result = self.run(
+                    path, pragmas, readers, writers, duration, posts
+                )
+                self.stdout.write(
+                    f'{name}: чтений {result["reads"] / duration:.0f}/с, '
+                    f'записей {result["writes"] / duration:.0f}/с, '
+                    f'ошибок блокировки {result["locked"]}'
+                )
+
+    @staticmethod
+    def connect(path, pragmas):
+        connection = sqlite3.connect(
+            path, timeout=5, isolation_level=None, check_same_thread=False
+        )
+        for pragma, value in pragmas.items():
+            connection.execute(f'PRAGMA {pragma} = {value}')
+        return connection
+
+    def prepare(self, path, pragmas, posts):
+        connection = self.connect(path, pragmas)
+        connection.executescript(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, pub_date REAL, '
+            'comment_count INTEGER NOT NULL DEFAULT 0);'
+            'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+            'created_at REAL, text TEXT);'
+            'CREATE INDEX comment_post ON comment (post_id, created_at);'
+            'CREATE INDEX post_pub_date ON post (pub_date DESC);'
+        )
+        connection.executemany(
+            'INSERT INTO post (pub_date) VALUES (?)',
+            ((time.time() - number,) for number in range(posts))
+        )
+        connection.close()
+
+    def run(self, path, pragmas, readers, writers, duration, posts):
+        self.result = {'reads': 0, 'writes': 0, 'locked': 0}
+        self.lock = threading.Lock()
+        self.deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=self.read, args=(path, pragmas))
+            for _ in range(readers)
+        ] + [
+            threading.Thread(
+                target=self.write, args=(path, pragmas, number % posts + 1)
+            )
+            for number in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.result
+
+    def count(self, key):
+        with self.lock:
+            self.result[key] += 1
+
+    def read(self, path, pragmas):
+        connection = self.connect(path, pragmas)
+        while time.perf_counter() < self.deadline:
+            try:
+                connection.execute(
+                    'SELECT id, comment_count FROM post '
+                    'ORDER BY pub_date DESC LIMIT 10'
+                ).fetchall()
+                self.count('reads')
+            except sqlite3.OperationalError:
+                self.count('locked')
+        connection.close()
+
+    def write(self, path, pragmas, post_id):
+        connection = self.connect(path, pragmas)
+        while time.perf_counter() < self.deadline:
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(
+                    'INSERT INTO comment (post_id, created_at, text) '
+                    'VALUES (?, ?, ?)',
+                    (post_id, time.time(), 'Комментарий')
+                )
+                connection.execute(
+                    'UPDATE post SET comment_count = comment_count + 1 '
+                    'WHERE id = ?',
+                    (post_id,)
+                )
+                connection.execute('COMMIT')
+                self.count('writes')
+            except sqlite3.OperationalError:
+                if connection.in_transaction:
+                    connection.execute('ROLLBACK')
+                self.count('locked')
+        connection.close()
@@ -0,0 +1,222 @@
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS = {
+    'blogicum_requests_total': (
+        'counter', 'Обработанные HTTP-запросы.'
+    ),
+    'blogicum_request_duration_seconds': (
+        'histogram', 'Время обработки HTTP-запроса.'
+    ),
+    'blogicum_db_queries_total': (
+        'counter', 'SQL-запросы, выполненные при обработке HTTP-запросов.'
+    ),
+    'blogicum_db_query_seconds_total': (
+        'counter', 'Суммарное время SQL-запросов.'
+    ),
+    'blogicum_cache_requests_total': (
+        'counter', 'Обращения к кэшам блога.'
+    ),
+    'blogicum_posts_created_total': (
+        'counter', 'Созданные публикации.'
+    ),
+    'blogicum_comments_created_total': (
+        'counter', 'Созданные комментарии.'
+    ),
+    'process_resident_memory_bytes': (
+        'gauge', 'Резидентная память процесса.'
+    ),
+}
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+lock = Lock()
+state = {'pid': None}
+
+
+def get_state():
+    if state['pid'] != os.getpid():
+        state.update(
+            pid=os.getpid(),
+            name=f'{os.getpid()}-{uuid4().hex[:8]}',
+            counters={},
+            histograms={},
+            flushed=0,
+        )
+    return state
+
+
+def inc(name, labels=(), value=1):
+    with lock:
+        counters = get_state()['counters']
+        counters[name, labels] = counters.get((name, labels), 0) + value
+
+
+def observe(name, labels, value):
+    with lock:
+        histograms = get_state()['histograms']
+        histogram = histograms.get((name, labels))
+        if histogram is None:
+            histogram = histograms[name, labels] = [0] * (len(BUCKETS) + 2)
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                break
+        else:
+            index = len(BUCKETS)
+        histogram[index] += 1
+        histogram[-1] += value
+
+
+def get_rss():
+    try:
+        with open('/proc/self/statm') as stream:
+            pages = int(stream.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def get_snapshot():
+    with lock:
+        current = get_state()
+        snapshot = {
+            'pid': current['pid'],
+            'counters': [
+                [name, labels, value]
+                for (name, labels), value in current['counters'].items()
+            ],
+            'histograms': [
+                [name, labels, histogram]
+                for (name, labels), histogram
+                in current['histograms'].items()
+            ],
+            'gauges': [],
+        }
+    rss = get_rss()
+    if rss is not None:
+        snapshot['gauges'].append([
+            'process_resident_memory_bytes',
+            [['pid', str(snapshot['pid'])]],
+            rss,
+        ])
+    return snapshot
+
+
+def get_directory():
+    directory = getattr(settings, 'BLOG_METRICS_DIR', None)
+    return directory and Path(directory)
+
+
+def flush(force=False):
+    directory = get_directory()
+    if directory is None:
+        return
+    with lock:
+        current = get_state()
+        if not force and monotonic() - current['flushed'] < getattr(
+            settings, 'BLOG_METRICS_FLUSH_SECONDS', 1
+        ):
+            return
+        current['flushed'] = monotonic()
+        name = current['name']
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{name}.json'
+    partial_path = path.with_name(f'{path.name}.part')
+    partial_path.write_text(json.dumps(get_snapshot()), encoding='utf-8')
+    os.replace(partial_path, path)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def get_snapshots():
+    directory = get_directory()
+    if directory is None:
+        return [get_snapshot()]
+    flush(force=True)
+    snapshots = []
+    for path in directory.glob('*.json'):
+        try:
+            snapshots.append(json.loads(path.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def collect():
+    counters = {}
+    histograms = {}
+    gauges = {}
+    for snapshot in get_snapshots():
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, histogram in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(histogram))
+            for index, value in enumerate(histogram):
+                total[index] += value
+        if is_alive(snapshot['pid']):
+            for name, labels, value in snapshot['gauges']:
+                gauges[name, tuple(map(tuple, labels))] = value
+    return counters, histograms, gauges
+
+
+def format_labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n')
+        )
+        for name, value in pairs
+    ) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    counters, histograms, gauges = collect()
+    samples = {name: [] for name in METRICS}
+    for (name, labels), value in sorted(counters.items()):
+        samples[name].append(f'{name}{format_labels(labels)} '
+                             f'{format_value(value)}')
+    for (name, labels), value in sorted(gauges.items()):
+        samples[name].append(f'{name}{format_labels(labels)} '
+                             f'{format_value(value)}')
+    for (name, labels), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, value in zip((*BUCKETS, '+Inf'), histogram):
+            cumulative += value
+            samples[name].append(
+                f'{name}_bucket{format_labels(labels, le=bound)} '
+                f'{cumulative}'
+            )
+        samples[name].append(f'{name}_sum{format_labels(labels)} '
+                             f'{format_value(histogram[-1])}')
+        samples[name].append(f'{name}_count{format_labels(labels)} '
+                             f'{cumulative}')
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples[name])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,197 @@
+import json
+import logging
+import re
+from time import perf_counter
+
+from django.conf import settings
+
+from . import metrics, querystats
+from .instrumentation import collect_timings
+from .routers import RoutingState, routing_state
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+KNOWN_METHODS = (*SAFE_METHODS, 'POST', 'PUT', 'PATCH', 'DELETE')
+
+logger = logging.getLogger('blog.query_budget')
+timing_logger = logging.getLogger('blog.timing')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class PrimaryStickinessMiddleware:
+    cookie_name = 'blog_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(
+            pinned=(
+                request.method not in SAFE_METHODS
+                or self.cookie_name in request.COOKIES
+            )
+        )
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        if (
+            state.wrote
+            and request.method not in SAFE_METHODS
+            and getattr(settings, 'BLOG_REPLICA_DATABASES', ())
+        ):
+            response.set_cookie(
+                self.cookie_name,
+                '1',
+                max_age=getattr(settings, 'BLOG_REPLICA_STICKY_SECONDS', 10),
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        with collect_timings() as timings:
+            response = self.get_response(request)
+        budget = request.query_budget
+        if budget is not None and timings.sql_count > budget:
+            self.report(request, budget, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        request.query_budget = getattr(view_class, 'query_budget', None)
+        request.query_budget_view = getattr(
+            view_class, '__name__', view_func.__name__
+        )
+
+    def report(self, request, budget, timings):
+        message = (
+            f'{request.query_budget_view} ({request.method} '
+            f'{request.path}) выполнил {timings.sql_count} SQL-запросов '
+            f'при бюджете {budget}:\n' + '\n'.join(timings.sql)
+        )
+        if getattr(settings, 'BLOG_QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def get_metric_name(template_name):
+    return 'tpl-' + re.sub(r'[^\w.-]', '-', template_name)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        with collect_timings() as timings:
+            response = self.get_response(request)
+        total = perf_counter() - started
+        view = max(
+            total - timings.template_time
+            - (timings.sql_time - timings.template_sql_time),
+            0
+        )
+        if getattr(settings, 'BLOG_SERVER_TIMING', True):
+            response['Server-Timing'] = self.get_header(
+                total, view, timings
+            )
+        if timing_logger.isEnabledFor(logging.INFO):
+            timing_logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': getattr(request.resolver_match, 'view_name', None),
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'view_ms': round(view * 1000, 2),
+                'db_queries': timings.sql_count,
+                'db_ms': round(timings.sql_time * 1000, 2),
+                'template_ms': round(timings.template_time * 1000, 2),
+                'includes': {
+                    name: {'count': count, 'ms': round(elapsed * 1000, 2)}
+                    for name, (count, elapsed) in timings.includes.items()
+                },
+            }, ensure_ascii=False))
+        return response
+
+    def get_header(self, total, view, timings):
+        metrics = [
+            f'total;dur={total * 1000:.2f}',
+            f'view;dur={view * 1000:.2f}',
+            f'db;dur={timings.sql_time * 1000:.2f};'
+            f'desc="{timings.sql_count} queries"',
+            f'tpl;dur={timings.template_time * 1000:.2f}',
+        ]
+        for name, (count, elapsed) in sorted(
+            timings.includes.items(), key=lambda item: -item[1][1]
+        ):
+            metrics.append(
+                f'{get_metric_name(name)};dur={elapsed * 1000:.2f};'
+                f'desc="{name} x{count}"'
+            )
+        return ', '.join(metrics)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'BLOG_QUERY_STATS', True):
+            return self.get_response(request)
+        querystats.sync()
+        token = querystats.current_view.set(None)
+        try:
+            with querystats.collect_query_stats():
+                response = self.get_response(request)
+        finally:
+            querystats.current_view.reset(token)
+        querystats.publish()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        querystats.current_view.set(request.resolver_match.view_name)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = perf_counter()
+        with collect_timings() as timings:
+            response = self.get_response(request)
+        elapsed = perf_counter() - started
+        labels = (
+            (
+                'view',
+                getattr(request.resolver_match, 'view_name', None)
+                or 'unresolved'
+            ),
+            (
+                'method',
+                request.method if request.method in KNOWN_METHODS
+                else 'other'
+            ),
+        )
+        metrics.observe('blogicum_request_duration_seconds', labels, elapsed)
+        metrics.inc(
+            'blogicum_requests_total',
+            (*labels, ('status', str(response.status_code)))
+        )
+        metrics.inc('blogicum_db_queries_total', labels, timings.sql_count)
+        metrics.inc(
+            'blogicum_db_query_seconds_total', labels, timings.sql_time
+        )
+        metrics.flush()
+        return response
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:40
+
+from math import ceil
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+WORDS_PER_MINUTE = 200
+CHUNK_SIZE = 2000
+
+
+def backfill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.only('pk', 'text').order_by('pk')
+    last_id = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last_id)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        for post in chunk:
+            post.excerpt = Truncator(post.text).words(
+                EXCERPT_WORDS, truncate=' …'
+            )
+            post.reading_time = max(
+                1, ceil(len(post.text.split()) / WORDS_PER_MINUTE)
+            )
+        Post.objects.bulk_update(chunk, ('excerpt', 'reading_time'))
+        last_id = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Отрывок'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Время чтения, мин'),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_excerpt_reading_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='rendered_html',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Готовый HTML'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-17 08:26
+
+import blog.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0018_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='author',
+            field=models.ForeignKey(
+                on_delete=blog.deletion.cascade_uncounted,
+                related_name='comments',
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='post',
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=blog.deletion.cascade_uncounted,
+                related_name='comments',
+                to='blog.post',
+                verbose_name='Пост',
+            ),
+        ),
+    ]
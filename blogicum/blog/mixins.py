@@ -1,15 +1,36 @@
+from hashlib import md5
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
+from django.core.paginator import InvalidPage
+from django.http import Http404
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
+from . import pagecache
+from .caching import get_versions, is_shared
 from .forms import CommentForm, PostForm
 from .models import Post, Comment
+from .paginators import CachedCountPaginator, KeysetPaginator
+
+
+class CachedObjectMixin:
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = self.find_object()
+        return self._cached_object
 
+    def find_object(self):
+        return super().get_object()
 
-class AuthMixin(UserPassesTestMixin):
+
+class AuthMixin(CachedObjectMixin, UserPassesTestMixin):
     def test_func(self):
-        return self.request.user == self.get_object().author
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin(AuthMixin, LoginRequiredMixin):
@@ -45,11 +66,113 @@ class CommentMixin(LoginRequiredMixin):
 
 class FilterMixin:
     @staticmethod
-    def select_annotate(objects):
-        return (
-            objects.select_related(
-                'author',
-                'location',
-                'category'
+    def select_posts(objects):
+        return objects.select_related(
+            'author',
+            'location',
+            'category'
+        ).defer('text').with_rendered_card().order_by('-pub_date')
+
+
+class PostPaginationMixin:
+    paginator_class = CachedCountPaginator
+
+    def get_count_cache_key(self):
+        return None
+
+    def get_count_dependencies(self):
+        return ('posts',)
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            cache_key=self.get_count_cache_key(),
+            dependencies=self.get_count_dependencies(),
+            **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not getattr(settings, 'BLOG_KEYSET_PAGINATION', False):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before')
             )
-        ).annotate(comment_count=Count('comments')).order_by('-pub_date')
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PageCacheMixin:
+    page_cache_params = ('page', 'after', 'before')
+
+    def get_page_dependencies(self):
+        return ('posts',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+            or not is_shared()
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = pagecache.get_key(request, self.page_cache_params)
+        response = pagecache.get(key)
+        if response is not None:
+            return pagecache.get_conditional(request, response)
+        with pagecache.recording() as versions:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                get_versions(self.get_page_dependencies())
+            if hasattr(response, 'render'):
+                response.render()
+        pagecache.store(key, request, response, versions)
+        return response
+
+
+class ConditionalGetMixin:
+    send_last_modified = False
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag_dependencies(self):
+        return ('posts',)
+
+    def get_etag(self, last_modified):
+        user = self.request.user
+        parts = (
+            last_modified.isoformat(),
+            *get_versions(self.get_etag_dependencies()).values(),
+            str(user.pk),
+            user.get_username(),
+        )
+        if user.is_authenticated:
+            # Вход меняет ключ сессии и CSRF-токен в формах страницы.
+            parts += (self.request.session.session_key,)
+        return quote_etag(md5('|'.join(parts).encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag = self.get_etag(last_modified)
+        timestamp = (
+            int(last_modified.timestamp())
+            if self.send_last_modified else None
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.setdefault('ETag', etag)
+            if timestamp is not None:
+                response.setdefault('Last-Modified', http_date(timestamp))
+        return response
@@ -1,19 +1,57 @@
+from math import ceil
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Case, Count, F, Max, OuterRef, Q, Subquery,
+                              Value, When)
+from django.db.models.fields.json import KeyTransform
+from django.db.models.functions import Coalesce
+from django.utils.text import Truncator
+from django.utils.timezone import now
 
-from .blog_constants import FIELD_LENGTH, TRUNCATED_MODEL_NAME
+from . import fragments, rendering
+from .blog_constants import (EXCERPT_WORDS,
+                             FIELD_LENGTH,
+                             TRUNCATED_MODEL_NAME,
+                             WORDS_PER_MINUTE)
+from .caching import bump_version
+from .deletion import cascade_uncounted, suppress_recount
 
 User = get_user_model()
 
 
-class CreatedAtModel(models.Model):
+def get_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+
+def get_reading_time(text):
+    return max(1, ceil(len(text.split()) / WORDS_PER_MINUTE))
+
+
+def fill_excerpts(posts, chunk_size):
+    posts = posts.only('pk', 'text').order_by('pk')
+    last_id = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        for post in chunk:
+            post.excerpt = get_excerpt(post.text)
+            post.reading_time = get_reading_time(post.text)
+        posts.model.objects.bulk_update(chunk, ('excerpt', 'reading_time'))
+        last_id = chunk[-1].pk
+        yield last_id
+
+
+class TimestampedModel(models.Model):
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = models.DateTimeField('Изменено', auto_now=True)
 
     class Meta:
         abstract = True
 
 
-class PublishedCreated(CreatedAtModel):
+class PublishedCreated(TimestampedModel):
     is_published = models.BooleanField(
         'Опубликовано',
         default=True,
@@ -24,9 +62,23 @@ class PublishedCreated(CreatedAtModel):
         abstract = True
 
 
+class LocationQuerySet(models.QuerySet):
+    def set_published(self, is_published):
+        pks = list(self.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = Location.objects.filter(pk__in=pks).update(
+                is_published=is_published, updated_at=now()
+            )
+            rendering.invalidate(Post.objects.filter(location__in=pks))
+        fragments.invalidate('location', pks)
+        return updated
+
+
 class Location(PublishedCreated):
     name = models.CharField('Название места', max_length=FIELD_LENGTH)
 
+    objects = LocationQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'местоположение'
         verbose_name_plural = 'Местоположения'
@@ -35,6 +87,20 @@ class Location(PublishedCreated):
         return self.name[:TRUNCATED_MODEL_NAME]
 
 
+class CategoryQuerySet(models.QuerySet):
+    def set_published(self, is_published):
+        pks = list(self.values_list('pk', flat=True))
+        with transaction.atomic():
+            updated = Category.objects.filter(pk__in=pks).update(
+                is_published=is_published, updated_at=now()
+            )
+            posts = Post.objects.filter(category__in=pks)
+            posts.refresh_visibility()
+            rendering.invalidate(posts)
+        fragments.invalidate('category', pks)
+        return updated
+
+
 class Category(PublishedCreated):
     title = models.CharField('Заголовок', max_length=FIELD_LENGTH)
     description = models.TextField('Описание', default='Описание отсутствует')
@@ -46,6 +112,8 @@ class Category(PublishedCreated):
                   'цифры, дефис и подчёркивание.'
     )
 
+    objects = CategoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
@@ -54,6 +122,98 @@ class Category(PublishedCreated):
         return self.title[:TRUNCATED_MODEL_NAME]
 
 
+class PostQuerySet(models.QuerySet):
+    @staticmethod
+    def visibility_predicate():
+        return Q(
+            is_published=True,
+            pub_date__lte=now(),
+            category__is_published=True
+        )
+
+    def visible(self):
+        return self.filter(is_visible=True)
+
+    def visible_to(self, user):
+        if not user.is_authenticated:
+            return self.visible()
+        return self.filter(Q(is_visible=True) | Q(author=user))
+
+    def get_lists(self):
+        return set(
+            self.order_by().values_list('category_id', 'author_id').distinct()
+        )
+
+    def refresh_visibility(self):
+        predicate = self.visibility_predicate()
+        hidden = self.filter(is_visible=True).exclude(predicate)
+        shown = self.filter(predicate, is_visible=False)
+        lists = hidden.get_lists() | shown.get_lists()
+        if not lists:
+            return 0
+        updated = hidden.update(
+            is_visible=False, updated_at=now()
+        ) + shown.update(
+            is_visible=True, updated_at=now()
+        )
+        fragments.invalidate_lists(lists)
+        bump_version('posts')
+        return updated
+
+    def set_published(self, is_published):
+        rows = list(self.values_list('pk', 'category_id', 'author_id'))
+        pks = [pk for pk, *_ in rows]
+        updated = Post.objects.filter(pk__in=pks).update(
+            is_published=is_published,
+            is_visible=Case(
+                When(
+                    pub_date__lte=now(),
+                    category__in=Category.objects.filter(is_published=True),
+                    then=Value(is_published)
+                ),
+                default=Value(False)
+            ),
+            rendered_html={},
+            updated_at=now()
+        )
+        fragments.invalidate('post', pks)
+        fragments.invalidate_lists({tuple(lists) for _, *lists in rows})
+        bump_version('posts')
+        return updated
+
+    def with_rendered_card(self):
+        return self.defer('rendered_html').annotate(**{
+            rendering.ANNOTATION.format('card'): KeyTransform(
+                'card', 'rendered_html'
+            )
+        })
+
+    def recount_comments(self):
+        actual_count = Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(count=Count('pk'))
+                .values('count')
+            ),
+            0
+        )
+        return self.exclude(comment_count=actual_count).update(
+            comment_count=actual_count, updated_at=now()
+        )
+
+    def last_modified(self, *related):
+        timestamps = self.order_by().aggregate(*(
+            Max(f'{prefix}__updated_at' if prefix else 'updated_at')
+            for prefix in ('', *related)
+        ))
+        return max(
+            (value for value in timestamps.values() if value is not None),
+            default=None
+        )
+
+
 class Post(PublishedCreated):
     title = models.CharField('Заголовок', max_length=FIELD_LENGTH)
     text = models.TextField('Текст')
@@ -65,7 +225,8 @@ class Post(PublishedCreated):
     author = models.ForeignKey(
         User,
         verbose_name='Автор публикации',
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False
     )
     location = models.ForeignKey(
         Location,
@@ -81,32 +242,170 @@ class Post(PublishedCreated):
         null=True
     )
     image = models.ImageField('Фото', upload_to='posts_images', blank=True)
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    is_visible = models.BooleanField(
+        'Виден в ленте',
+        default=False,
+        editable=False
+    )
+    excerpt = models.TextField('Отрывок', blank=True, editable=False)
+    reading_time = models.PositiveSmallIntegerField(
+        'Время чтения, мин',
+        default=1,
+        editable=False
+    )
+    rendered_html = models.JSONField(
+        'Готовый HTML',
+        default=dict,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date',),
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_category_idx'
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=False, is_published=True),
+                name='post_scheduled_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('updated_at',),
+                condition=models.Q(is_visible=True),
+                name='post_visible_updated_idx'
+            ),
+            models.Index(
+                fields=('category', 'updated_at'),
+                condition=models.Q(is_visible=True),
+                name='post_category_updated_idx'
+            ),
+            models.Index(
+                fields=('author', 'updated_at'),
+                name='post_author_updated_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title[:TRUNCATED_MODEL_NAME]
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        derived_fields = {'is_visible', 'updated_at'}
+        self.is_visible = (
+            self.is_published
+            and self.pub_date <= now()
+            and self.category is not None
+            and self.category.is_published
+        )
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt = get_excerpt(self.text)
+            self.reading_time = get_reading_time(self.text)
+            derived_fields |= {'excerpt', 'reading_time'}
+        rerender = (
+            update_fields is None
+            or rendering.SOURCE_FIELDS & set(update_fields)
+        )
+        if rerender:
+            # Файл изображения получает окончательное имя только
+            # при сохранении, поэтому HTML рисуется после него.
+            self._meta.get_field('image').pre_save(self, self._state.adding)
+            rendering.render_all(self)
+            derived_fields.add('rendered_html')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *derived_fields}
+        super().save(*args, **kwargs)
 
-class Comment(CreatedAtModel):
+    @property
+    def rendered_card(self):
+        return rendering.get_rendered(self, 'card')
+
+    @property
+    def rendered_text(self):
+        return rendering.get_rendered(self, 'text')
+
+
+class CommentQuerySet(models.QuerySet):
+    def discount(self):
+        deleted_count = Coalesce(
+            Subquery(
+                self.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(count=Count('pk'))
+                .values('count')
+            ),
+            0
+        )
+        Post.objects.filter(pk__in=self.values('post')).update(
+            comment_count=F('comment_count') - deleted_count,
+            updated_at=now()
+        )
+
+    def delete_and_recount(self):
+        post_ids = set(self.values_list('post_id', flat=True))
+        with transaction.atomic(), suppress_recount():
+            self.discount()
+            deleted, _ = self.delete()
+        fragments.invalidate('comments', post_ids)
+        return deleted
+
+
+class Comment(TimestampedModel):
     text = models.TextField('Оставить комментарий')
     post = models.ForeignKey(
         Post,
         verbose_name='Пост',
-        on_delete=models.CASCADE,
-        related_name='comments'
+        on_delete=cascade_uncounted,
+        related_name='comments',
+        db_index=False
     )
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    author = models.ForeignKey(User, on_delete=cascade_uncounted)
+
+    objects = CommentQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:TRUNCATED_MODEL_NAME]
+
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев обновляется в post_save,
+        # поэтому он должен попасть в ту же транзакцию.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
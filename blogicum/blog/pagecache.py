@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from . import metrics
+from .caching import get_versions, used_versions
+
+PAGE_KEY = 'blog:page:{}'
+VALIDATORS = ('ETag', 'Last-Modified')
+
+
+def get_key(request, params):
+    parts = [request.path, *(request.GET.get(name, '') for name in params)]
+    return PAGE_KEY.format(md5('|'.join(parts).encode()).hexdigest())
+
+
+def count(hit):
+    metrics.inc('blogicum_cache_requests_total', (
+        ('cache', 'page'), ('result', 'hit' if hit else 'miss'),
+    ))
+
+
+def get(key):
+    entry = cache.get(key)
+    if entry is not None and get_versions(entry['versions']) != (
+        entry['versions']
+    ):
+        entry = None
+    count(entry is not None)
+    if entry is None:
+        return None
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type']
+    )
+    for name, value in entry.get('validators', {}).items():
+        response[name] = value
+    return response
+
+
+def get_conditional(request, response):
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(
+            response.get('Last-Modified', '')
+        ),
+        response=response
+    )
+
+
+@contextmanager
+def recording():
+    versions = {}
+    token = used_versions.set(versions)
+    try:
+        yield versions
+    finally:
+        used_versions.reset(token)
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def store(key, request, response, versions):
+    if not is_cacheable(request, response):
+        return
+    cache.set(
+        key,
+        {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'versions': versions,
+            'validators': {
+                name: response[name]
+                for name in VALIDATORS if response.has_header(name)
+            },
+        },
+        getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 300)
+    )
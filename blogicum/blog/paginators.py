@@ -0,0 +1,203 @@
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from . import metrics
+from .caching import get_versions
+
+
+class ElidedPage(Page):
+    @property
+    def page_window(self):
+        return list(self.paginator.get_elided_page_range(self.number))
+
+
+class ElidedPaginator(Paginator):
+    def _get_page(self, *args, **kwargs):
+        return ElidedPage(*args, **kwargs)
+
+
+class BoundedPage(ElidedPage):
+    def has_next(self):
+        return super().has_next() or (
+            self.paginator.is_bounded
+            and len(self.object_list) == self.paginator.per_page
+        )
+
+
+class CachedCountPaginator(ElidedPaginator):
+    def __init__(self, object_list, per_page, cache_key=None,
+                 dependencies=('posts',), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.dependencies = dependencies
+
+    def _get_page(self, *args, **kwargs):
+        return BoundedPage(*args, **kwargs)
+
+    @cached_property
+    def is_bounded(self):
+        # Количество упёрлось в лимит подсчёта: страницы за ним
+        # открываются, пока в них есть записи.
+        return self.count >= getattr(
+            settings, 'BLOG_PAGINATOR_COUNT_LIMIT', 10000
+        )
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.is_bounded or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if number < self.num_pages or not self.is_bounded:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        page = self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+        if number > self.num_pages and not page.object_list:
+            raise EmptyPage('На этой странице нет записей.')
+        return page
+
+    @cached_property
+    def count(self):
+        if self.cache_key is None:
+            return self.bounded_count()
+        versions = ':'.join(get_versions(self.dependencies).values())
+        key = f'blog:count:{versions}:{self.cache_key}'
+        count = cache.get(key)
+        metrics.inc('blogicum_cache_requests_total', (
+            ('cache', 'paginator_count'),
+            ('result', 'miss' if count is None else 'hit'),
+        ))
+        if count is None:
+            count = self.bounded_count()
+            cache.set(
+                key,
+                count,
+                getattr(settings, 'BLOG_PAGINATOR_COUNT_TIMEOUT', 60)
+            )
+        return count
+
+    def bounded_count(self):
+        limit = getattr(settings, 'BLOG_PAGINATOR_COUNT_LIMIT', 10000)
+        count = self.object_list[:limit].count()
+        if count < limit:
+            return count
+        estimate = self.estimate_count()
+        if estimate is None:
+            return count
+        return max(count, estimate)
+
+    def estimate_count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        sql, params = self.object_list.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPage(Sequence):
+    is_keyset = True
+    number = None
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return self.paginator.encode_cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    def __init__(self, object_list, per_page, date_field='pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.date_field = date_field
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.date_field).isoformat()
+        return urlsafe_base64_encode(f'{value}|{obj.pk}'.encode())
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = force_str(urlsafe_base64_decode(cursor)).split('|')
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            value = None
+        if value is None:
+            raise InvalidPage('Некорректный курсор страницы.')
+        return value, pk
+
+    def page(self, after=None, before=None):
+        field = self.date_field
+        queryset = self.object_list
+        if before:
+            value, pk = self.decode_cursor(before)
+            objects = list(
+                queryset.filter(
+                    Q(**{f'{field}__gt': value})
+                    | Q(**{field: value, 'pk__gt': pk}),
+                    **{f'{field}__gte': value}
+                ).order_by(field, 'pk')[:self.per_page + 1]
+            )
+            has_previous = len(objects) > self.per_page
+            objects = objects[:self.per_page][::-1]
+            return KeysetPage(objects, self, True, has_previous)
+        if after:
+            value, pk = self.decode_cursor(after)
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': value})
+                | Q(**{field: value, 'pk__lt': pk}),
+                **{f'{field}__lte': value}
+            )
+        objects = list(
+            queryset.order_by(f'-{field}', '-pk')[:self.per_page + 1]
+        )
+        has_next = len(objects) > self.per_page
+        return KeysetPage(
+            objects[:self.per_page], self, has_next, bool(after)
+        )
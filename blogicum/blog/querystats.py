@@ -0,0 +1,171 @@
+import os
+import re
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, partial
+from threading import Lock
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .caching import bump_version, get_version
+
+NORMALIZERS = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+SNAPSHOT_KEY = 'blog:querystats:{}:{}'
+PROCESSES_KEY = 'blog:querystats:{}:processes'
+OTHER = '<прочие запросы>'
+SORT_FIELDS = ('total', 'count', 'max', 'mean')
+
+current_view = ContextVar('blog_query_view', default=None)
+lock = Lock()
+state = {'entries': {}, 'version': None, 'published': 0}
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    for pattern, replacement in NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def explain(connection, sql, params):
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(
+            f'{connection.ops.explain_query_prefix()} {sql}', params
+        )
+        return '\n'.join(
+            ' '.join(str(value) for value in row)
+            for row in cursor.fetchall()
+        )
+    except Exception as error:
+        return f'EXPLAIN не выполнен: {error}'
+    finally:
+        cursor.close()
+
+
+def record(view, sql, elapsed, get_plan=None):
+    key = (view or '', fingerprint(sql))
+    with lock:
+        entries = state['entries']
+        if key not in entries and len(entries) >= getattr(
+            settings, 'BLOG_QUERY_STATS_LIMIT', 1000
+        ):
+            key = (key[0], OTHER)
+        entry = entries.setdefault(key, {
+            'view': key[0],
+            'fingerprint': key[1],
+            'count': 0,
+            'total': 0,
+            'max': 0,
+            'plan': None,
+        })
+        entry['count'] += 1
+        entry['total'] += elapsed
+        entry['max'] = max(entry['max'], elapsed)
+        needs_plan = get_plan is not None and entry['plan'] is None
+    if needs_plan:
+        plan = get_plan()
+        with lock:
+            entry['plan'] = plan
+
+
+def record_query(execute, sql, params, many, context):
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (perf_counter() - started) * 1000
+        get_plan = None
+        if (
+            not many
+            and elapsed >= getattr(settings, 'BLOG_SLOW_QUERY_MS', 100)
+            and sql.lstrip()[:6].upper() == 'SELECT'
+        ):
+            get_plan = partial(explain, context['connection'], sql, params)
+        record(current_view.get(), sql, elapsed, get_plan)
+
+
+@contextmanager
+def collect_query_stats():
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(record_query))
+        yield
+
+
+def get_snapshot():
+    with lock:
+        return [dict(entry) for entry in state['entries'].values()]
+
+
+def sync():
+    version = get_version('querystats')
+    with lock:
+        if state['version'] != version:
+            state['entries'] = {}
+            state['version'] = version
+    return version
+
+
+def reset():
+    bump_version('querystats')
+    sync()
+
+
+def publish(force=False):
+    version = state['version'] or sync()
+    with lock:
+        if not force and monotonic() - state['published'] < getattr(
+            settings, 'BLOG_QUERY_STATS_PUBLISH_SECONDS', 10
+        ):
+            return
+        state['published'] = monotonic()
+    processes_key = PROCESSES_KEY.format(version)
+    processes = cache.get(processes_key, set())
+    if os.getpid() not in processes:
+        cache.set(processes_key, processes | {os.getpid()}, None)
+    cache.set(SNAPSHOT_KEY.format(version, os.getpid()), get_snapshot(), None)
+
+
+def get_published():
+    version = get_version('querystats')
+    processes = cache.get(PROCESSES_KEY.format(version), set())
+    snapshots = cache.get_many([
+        SNAPSHOT_KEY.format(version, pid) for pid in processes
+    ])
+    return [
+        entry for snapshot in snapshots.values() for entry in snapshot
+    ]
+
+
+def merge(entries):
+    merged = {}
+    for entry in entries:
+        key = (entry['view'], entry['fingerprint'])
+        if key not in merged:
+            merged[key] = dict(entry)
+            continue
+        target = merged[key]
+        target['count'] += entry['count']
+        target['total'] += entry['total']
+        if entry['max'] > target['max'] or target['plan'] is None:
+            target['plan'] = entry['plan'] or target['plan']
+        target['max'] = max(target['max'], entry['max'])
+    for entry in merged.values():
+        entry['mean'] = entry['total'] / entry['count']
+    return list(merged.values())
+
+
+def get_top(limit=20, sort='total'):
+    publish(force=True)
+    return sorted(
+        merge(get_published()), key=lambda entry: -entry[sort]
+    )[:limit]
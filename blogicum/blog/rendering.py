@@ -0,0 +1,184 @@
+import json
+from collections import Counter
+from functools import lru_cache
+from hashlib import md5
+from threading import Lock
+from time import perf_counter
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Case, F, Func, JSONField, Value, When
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.timezone import now
+
+from . import metrics
+
+TEMPLATES = {
+    'card': (
+        'includes/post_card_content.html',
+        'includes/category_link.html',
+    ),
+    'text': ('includes/post_text.html',),
+}
+SOURCE_FIELDS = {
+    'title', 'text', 'pub_date', 'is_published',
+    'author', 'location', 'category', 'image',
+}
+ANNOTATION = 'stored_{}'
+FRESH = 'fresh_{}'
+STATS_KEY = 'blog:render:{}:{}'
+STATS = ('hits', 'misses', 'renders', 'render_us')
+CACHE_RESULTS = {'hits': 'hit', 'misses': 'miss'}
+
+# Счётчики копятся в процессе и записываются в кэш в конце запроса.
+pending_stats = Counter()
+lock = Lock()
+
+
+class JSONSetKey(Func):
+    output_field = JSONField()
+
+    def __init__(self, field, key, value):
+        super().__init__(F(field), Value(json.dumps(value)))
+        self.key = key
+
+    def as_sql(self, compiler, connection, **extra_context):
+        field, value = self.get_source_expressions()
+        field_sql, field_params = compiler.compile(field)
+        value_sql, value_params = compiler.compile(value)
+        if connection.vendor == 'postgresql':
+            sql = f'JSONB_SET({field_sql}, %s, {value_sql}::jsonb)'
+            path = f'{{{self.key}}}'
+        elif connection.vendor == 'mysql':
+            sql = f'JSON_SET({field_sql}, %s, CAST({value_sql} AS JSON))'
+            path = f'$.{self.key}'
+        else:
+            sql = f'JSON_SET({field_sql}, %s, JSON({value_sql}))'
+            path = f'$.{self.key}'
+        return sql, (*field_params, path, *value_params)
+
+
+@lru_cache(maxsize=None)
+def get_template_version(kind):
+    source = ''.join(
+        get_template(name).template.source for name in TEMPLATES[kind]
+    )
+    return md5(source.encode()).hexdigest()
+
+
+def count(kind, stat, value=1):
+    if stat in CACHE_RESULTS:
+        metrics.inc('blogicum_cache_requests_total', (
+            ('cache', f'rendered_{kind}'),
+            ('result', CACHE_RESULTS[stat]),
+        ))
+    with lock:
+        pending_stats[kind, stat] += value
+
+
+def flush_stats():
+    with lock:
+        stats = dict(pending_stats)
+        pending_stats.clear()
+    for (kind, stat), value in stats.items():
+        key = STATS_KEY.format(kind, stat)
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            if not cache.add(key, value, None):
+                cache.incr(key, value)
+
+
+def get_stats():
+    flush_stats()
+    keys = {
+        (kind, stat): STATS_KEY.format(kind, stat)
+        for kind in TEMPLATES for stat in STATS
+    }
+    values = cache.get_many(keys.values())
+    return {
+        kind: {stat: values.get(keys[kind, stat], 0) for stat in STATS}
+        for kind in TEMPLATES
+    }
+
+
+def reset_stats():
+    with lock:
+        pending_stats.clear()
+    cache.delete_many([
+        STATS_KEY.format(kind, stat)
+        for kind in TEMPLATES for stat in STATS
+    ])
+
+
+def render(post, kind):
+    started = perf_counter()
+    post.rendered_html[kind] = {
+        'version': get_template_version(kind),
+        'html': render_to_string(TEMPLATES[kind][0], {'post': post}),
+    }
+    count(kind, 'renders')
+    count(kind, 'render_us', int((perf_counter() - started) * 1_000_000))
+
+
+def render_all(post):
+    post.rendered_html = {}
+    for kind in TEMPLATES:
+        render(post, kind)
+
+
+def get_stored(post, kind):
+    annotation = ANNOTATION.format(kind)
+    if annotation in vars(post):
+        return vars(post)[annotation]
+    return post.rendered_html.get(kind)
+
+
+def is_current(post, kind):
+    rendered = get_stored(post, kind)
+    return bool(rendered) and rendered['version'] == get_template_version(
+        kind
+    )
+
+
+def get_rendered(post, kind):
+    if is_current(post, kind):
+        rendered = get_stored(post, kind)
+        if not vars(post).pop(FRESH.format(kind), False):
+            count(kind, 'hits')
+        return mark_safe(rendered['html'])
+    count(kind, 'misses')
+    render(post, kind)
+    type(post).objects.using(DEFAULT_DB_ALIAS).filter(pk=post.pk).update(
+        rendered_html=post.rendered_html
+    )
+    return mark_safe(post.rendered_html[kind]['html'])
+
+
+def refresh(posts, kind):
+    stale = [post for post in posts if not is_current(post, kind)]
+    if not stale:
+        return
+    for post in stale:
+        count(kind, 'misses')
+        if 'rendered_html' in post.get_deferred_fields():
+            post.rendered_html = {}
+        render(post, kind)
+        vars(post)[ANNOTATION.format(kind)] = post.rendered_html[kind]
+        vars(post)[FRESH.format(kind)] = True
+    type(stale[0]).objects.using(DEFAULT_DB_ALIAS).filter(
+        pk__in=[post.pk for post in stale]
+    ).update(rendered_html=Case(
+        *(
+            When(pk=post.pk, then=JSONSetKey(
+                'rendered_html', kind, post.rendered_html[kind]
+            ))
+            for post in stale
+        ),
+        output_field=JSONField()
+    ))
+
+
+def invalidate(posts):
+    return posts.update(rendered_html={}, updated_at=now())
@@ -0,0 +1,44 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+routing_state = ContextVar('routing_state', default=None)
+
+
+def get_routing_state():
+    state = routing_state.get()
+    if state is None:
+        state = RoutingState()
+        routing_state.set(state)
+    return state
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'BLOG_REPLICA_DATABASES', ())
+        if not replicas or get_routing_state().pinned:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = get_routing_state()
+        state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {
+            DEFAULT_DB_ALIAS,
+            *getattr(settings, 'BLOG_REPLICA_DATABASES', ())
+        }
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
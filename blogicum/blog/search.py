@@ -0,0 +1,93 @@
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+
+SEARCH_TABLE = 'blog_post_fts'
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+
+def has_search_table(connection):
+    return connection.vendor == 'sqlite'
+
+
+def get_write_connection():
+    from .models import Post
+
+    return connections[router.db_for_write(Post)]
+
+
+def get_terms(query):
+    return re.findall(r'\w+', query)
+
+
+def build_match(terms):
+    phrases = ['"{}"'.format(term.replace('"', '""')) for term in terms]
+    phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+def match_posts(queryset, query):
+    terms = get_terms(query)
+    if not terms:
+        return queryset.none()
+    if not has_search_table(connections[queryset.db]):
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(text__icontains=term)
+            )
+        return queryset
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = blog_post.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[build_match(terms)],
+    )
+
+
+def search_posts(queryset, query):
+    queryset = match_posts(queryset, query)
+    if not get_terms(query) or not has_search_table(
+        connections[queryset.db]
+    ):
+        return queryset
+    return queryset.extra(
+        select={
+            'search_rank': f'bm25({SEARCH_TABLE}, 10.0, 1.0)',
+            'title_highlight': (
+                f'highlight({SEARCH_TABLE}, 0, char(2), char(3))'
+            ),
+            'text_snippet': (
+                f"snippet({SEARCH_TABLE}, 1, char(2), char(3), '…', 24)"
+            ),
+        },
+    ).order_by('search_rank', '-pub_date')
+
+
+def index_post(post):
+    connection = get_write_connection()
+    if not has_search_table(connection):
+        return
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [post.pk, post.title, post.text]
+            )
+
+
+def remove_post(post_id):
+    connection = get_write_connection()
+    if not has_search_table(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post_id]
+        )
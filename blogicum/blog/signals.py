@@ -0,0 +1,200 @@
+from django.conf import settings
+from django.core.signals import request_finished
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (post_delete,
+                                      post_init,
+                                      post_save,
+                                      pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from . import fragments, metrics, rendering, search
+from .caching import bump_version
+from .deletion import is_recounted
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+RENDERED_USER_FIELDS = ('username', 'first_name', 'last_name')
+PROFILE_FIELDS = (*RENDERED_USER_FIELDS, 'email', 'is_staff')
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta, updated_at=now()
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw, **kwargs):
+    instance._previous_post_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_post_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('post_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous_post_id = instance._previous_post_id
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif previous_post_id and previous_post_id != instance.post_id:
+        change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(pre_delete, sender=User)
+def discount_author_comments(sender, instance, **kwargs):
+    comments = Comment.objects.filter(author=instance).exclude(
+        post__author=instance
+    )
+    fragments.invalidate(
+        'comments', set(comments.values_list('post_id', flat=True))
+    )
+    comments.discount()
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    if is_recounted(instance):
+        change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_post_counts(sender, **kwargs):
+    bump_version('posts')
+
+
+def get_post_lists(post):
+    return vars(post).get('category_id'), vars(post).get('author_id')
+
+
+@receiver(post_init, sender=Post)
+def remember_post_lists(sender, instance, **kwargs):
+    instance._lists = get_post_lists(instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_lists(sender, instance, **kwargs):
+    lists = get_post_lists(instance)
+    fragments.invalidate_lists({instance._lists, lists})
+    instance._lists = lists
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_posts(sender, instance, raw, **kwargs):
+    if not raw:
+        instance.posts.refresh_visibility()
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    fragments.invalidate_lists(instance.posts.get_lists())
+    instance.posts.update(is_visible=False, updated_at=now())
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for pragma, value in getattr(settings, 'BLOG_SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {pragma} = {value}')
+
+
+@receiver(request_finished)
+def flush_render_stats(sender, **kwargs):
+    rendering.flush_stats()
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw, update_fields, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        search.index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_index(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def invalidate_rendered_posts(sender, instance, raw, **kwargs):
+    if not raw:
+        rendering.invalidate(instance.posts)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def invalidate_orphaned_posts(sender, instance, **kwargs):
+    rendering.invalidate(instance.posts)
+
+
+def get_profile_fields(user):
+    return {name: vars(user).get(name) for name in PROFILE_FIELDS}
+
+
+@receiver(post_init, sender=User)
+def remember_profile_fields(sender, instance, **kwargs):
+    instance._profile_fields = get_profile_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_posts(sender, instance, created, raw, **kwargs):
+    profile_fields = get_profile_fields(instance)
+    instance._changed_fields = set() if created or raw else {
+        name for name, value in profile_fields.items()
+        if value != instance._profile_fields[name]
+    }
+    instance._profile_fields = profile_fields
+    if instance._changed_fields.intersection(RENDERED_USER_FIELDS):
+        rendering.invalidate(instance.posts)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def count_created(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        metrics.inc(f'blogicum_{sender._meta.model_name}s_created_total')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_fragments(sender, instance, **kwargs):
+    fragments.invalidate(sender._meta.model_name, [instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_fragments(sender, instance, **kwargs):
+    if not is_recounted(instance):
+        return
+    fragments.invalidate('comments', {
+        instance.post_id,
+        getattr(instance, '_previous_post_id', None) or instance.post_id,
+    })
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_fragments(sender, instance, **kwargs):
+    if not instance._changed_fields:
+        return
+    fragments.invalidate('user', [instance.pk])
+    if instance._changed_fields.intersection(RENDERED_USER_FIELDS):
+        bump_version(fragments.USERNAMES)
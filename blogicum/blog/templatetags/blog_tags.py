@@ -0,0 +1,37 @@
+from django import template
+from django.contrib.auth.models import AnonymousUser
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog import fragments
+from blog.search import HIGHLIGHT_END, HIGHLIGHT_START
+
+register = template.Library()
+
+
+@register.filter
+def highlight(value):
+    return mark_safe(
+        escape(value)
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_END, '</mark>')
+    )
+
+
+@register.filter
+def post_cards(posts):
+    return fragments.render_cards(posts)
+
+
+@register.simple_tag(takes_context=True)
+def cached_header(context):
+    return fragments.render_header(
+        context.get('request'), context.get('user', AnonymousUser())
+    )
+
+
+@register.simple_tag(takes_context=True)
+def cached_comments(context):
+    return fragments.render_comments(
+        context['post'], context['page_obj'], context['user']
+    )
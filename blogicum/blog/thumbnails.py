@@ -0,0 +1,29 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from .blog_constants import THUMBNAIL_SIZE
+
+
+def get_thumbnail_name(name, size=THUMBNAIL_SIZE):
+    path = PurePosixPath(name)
+    width, height = size
+    return str(
+        PurePosixPath('thumbnails', f'{width}x{height}', *path.parts[:-1])
+        / f'{path.stem}.jpg'
+    )
+
+
+def get_thumbnail_url(image, size=THUMBNAIL_SIZE):
+    name = get_thumbnail_name(image.name, size)
+    if not default_storage.exists(name):
+        with image.open('rb'), Image.open(image) as picture:
+            picture = picture.convert('RGB')
+            picture.thumbnail(size)
+            content = BytesIO()
+            picture.save(content, 'JPEG', quality=80)
+        default_storage.save(name, ContentFile(content.getvalue()))
+    return default_storage.url(name)
@@ -25,8 +25,12 @@ urlpatterns = [
          name='post_detail'),
     path('category/<slug:category_slug>/', views.CategoryListView.as_view(),
          name='category_posts'),
+    path('search/', views.SearchListView.as_view(),
+         name='search'),
     path('profile/edit/', views.ProfileUpdateView.as_view(),
          name='edit_profile'),
     path('profile/<username>/', views.ProfileListView.as_view(),
          name='profile'),
+    path('query-stats/', views.QueryStatsView.as_view(),
+         name='query_stats'),
 ]
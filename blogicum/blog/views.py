@@ -1,44 +1,90 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db.models import Max, OuterRef, Subquery
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
-from django.utils.timezone import now
+from django.utils.crypto import constant_time_compare
 from django.views.generic import (CreateView,
                                   DeleteView,
                                   ListView,
-                                  UpdateView)
+                                  TemplateView,
+                                  UpdateView,
+                                  View)
 
-from .blog_constants import INDEX_POSTS_LIMITER
+from . import fragments, metrics, querystats
+from .blog_constants import INDEX_POSTS_LIMITER, QUERY_STATS_LIMIT
+from .caching import is_shared
 from .forms import (CommentForm,
                     PostForm,
                     RegistrationForm,
                     ProfileUpdate)
 from .models import Category, Post, User
-from .mixins import AuthMixin, PostMixin, CommentMixin, FilterMixin
+from .mixins import (AuthMixin,
+                     CachedObjectMixin,
+                     CommentMixin,
+                     ConditionalGetMixin,
+                     FilterMixin,
+                     PageCacheMixin,
+                     PostMixin,
+                     PostPaginationMixin)
+from .paginators import ElidedPaginator
+from .search import search_posts
 
 
 class RegistrationCreateView(CreateView):
+    query_budget = 3
     template_name = 'registration/registration_form.html'
     form_class = RegistrationForm
     success_url = reverse_lazy('blog:index')
 
 
-class ProfileListView(FilterMixin, ListView):
+class ProfileListView(PageCacheMixin,
+                      ConditionalGetMixin,
+                      CachedObjectMixin,
+                      PostPaginationMixin,
+                      FilterMixin,
+                      ListView):
+    query_budget = 6
     model = Post
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
     paginate_by = INDEX_POSTS_LIMITER
 
-    def get_object(self):
+    def find_object(self):
+        user = self.request.user
+        if user.get_username() == self.kwargs['username']:
+            return user
         return get_object_or_404(
             User,
             username=self.kwargs['username']
         )
 
     def get_queryset(self):
-        return self.select_annotate(Post.objects.filter(
-            author__username=self.get_object().username
-        ))
+        return self.select_posts(
+            self.get_object().posts.visible_to(self.request.user)
+        )
+
+    def get_last_modified(self):
+        return self.get_object().posts.visible_to(
+            self.request.user
+        ).last_modified()
+
+    def get_count_cache_key(self):
+        profile = self.get_object()
+        return f'profile:{profile.pk}:{profile == self.request.user}'
+
+    def get_count_dependencies(self):
+        return (fragments.get_name('author_posts', self.get_object().pk),)
+
+    def get_page_dependencies(self):
+        return (
+            *self.get_count_dependencies(),
+            fragments.get_name('user', self.get_object().pk),
+        )
+
+    def get_etag_dependencies(self):
+        return self.get_page_dependencies()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -47,6 +93,7 @@ class ProfileListView(FilterMixin, ListView):
 
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
+    query_budget = 5
     template_name = 'blog/user.html'
     model = User
     form_class = ProfileUpdate
@@ -59,7 +106,12 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
                             kwargs={'username': self.request.user})
 
 
-class IndexListView(FilterMixin, ListView):
+class IndexListView(PageCacheMixin,
+                    ConditionalGetMixin,
+                    PostPaginationMixin,
+                    FilterMixin,
+                    ListView):
+    query_budget = 5
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
@@ -67,38 +119,56 @@ class IndexListView(FilterMixin, ListView):
     paginate_by = INDEX_POSTS_LIMITER
 
     def get_queryset(self):
-        return self.select_annotate(Post.objects.filter(
-            pub_date__lte=now(),
-            is_published=True,
-            category__is_published=True
-        ))
+        return self.select_posts(Post.objects.visible())
+
+    def get_last_modified(self):
+        return Post.objects.visible().last_modified()
 
+    def get_count_cache_key(self):
+        return 'index'
 
-class PostListView(FilterMixin, ListView):
+
+class PostListView(PageCacheMixin,
+                   ConditionalGetMixin,
+                   CachedObjectMixin,
+                   FilterMixin,
+                   ListView):
+    query_budget = 6
     model = Post
     template_name = 'blog/detail.html'
     paginate_by = INDEX_POSTS_LIMITER
+    paginator_class = ElidedPaginator
+    send_last_modified = True
 
-    def get_object(self):
-        post = get_object_or_404(
-            Post.objects.select_related(
+    def find_object(self):
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user).select_related(
                 'author',
                 'location',
                 'category'
             ),
             pk=self.kwargs['pk'])
-        if (self.request.user != post.author
-            and (post.pub_date > now()
-                 or not post.is_published
-                 or not post.category.is_published)):
-            raise Http404
-        return post
 
     def get_queryset(self):
         return self.get_object().comments.select_related(
             'author'
         )
 
+    def get_last_modified(self):
+        return Post.objects.visible_to(self.request.user).filter(
+            pk=self.kwargs['pk']
+        ).last_modified('comments')
+
+    def get_etag_dependencies(self):
+        return (
+            fragments.get_name('post', self.kwargs['pk']),
+            fragments.get_name('comments', self.kwargs['pk']),
+            fragments.USERNAMES,
+        )
+
+    def get_page_dependencies(self):
+        return fragments.get_card_names(self.get_object())
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
@@ -106,33 +176,81 @@ class PostListView(FilterMixin, ListView):
         return context
 
 
-class CategoryListView(FilterMixin, ListView):
+class CategoryListView(PageCacheMixin,
+                       ConditionalGetMixin,
+                       CachedObjectMixin,
+                       PostPaginationMixin,
+                       FilterMixin,
+                       ListView):
+    query_budget = 5
     model = Post
     template_name = 'blog/category.html'
     context_object_name = 'post'
     paginate_by = INDEX_POSTS_LIMITER
 
-    def get_object(self):
+    def find_object(self):
         category = get_object_or_404(
-            Category,
+            Category.objects.annotate(last_modified=Subquery(
+                Post.objects.visible()
+                .filter(category=OuterRef('pk'))
+                .order_by()
+                .values('category')
+                .annotate(updated_at=Max('updated_at'))
+                .values('updated_at')
+            )),
             slug=self.kwargs['category_slug'],
             is_published=True,
         )
         return category
 
     def get_queryset(self):
-        return self.select_annotate(self.get_object().posts.filter(
-            pub_date__lte=now(),
-            is_published=True,
-        ))
+        return self.select_posts(self.get_object().posts.visible())
+
+    def get_last_modified(self):
+        return self.get_object().last_modified
+
+    def get_count_cache_key(self):
+        return f'category:{self.get_object().pk}'
+
+    def get_count_dependencies(self):
+        return (fragments.get_name('category_posts', self.get_object().pk),)
+
+    def get_page_dependencies(self):
+        return (
+            *self.get_count_dependencies(),
+            fragments.get_name('category', self.get_object().pk),
+        )
+
+    def get_etag_dependencies(self):
+        return self.get_page_dependencies()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = self.get_object
+        context['category'] = self.get_object()
+        return context
+
+
+class SearchListView(FilterMixin, ListView):
+    query_budget = 4
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = INDEX_POSTS_LIMITER
+    paginator_class = ElidedPaginator
+
+    def get_queryset(self):
+        return search_posts(
+            self.select_posts(Post.objects.visible()),
+            self.request.GET.get('q', '')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
         return context
 
 
 class PostCreateView(LoginRequiredMixin, CreateView):
+    query_budget = 11
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -146,16 +264,20 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
 
 class PostUpdateView(PostMixin, UpdateView):
+    query_budget = 12
+
     def get_success_url(self):
         return reverse_lazy('blog:post_detail',
                             kwargs={'pk': self.kwargs['post_id']})
 
 
 class PostDeleteView(PostMixin, DeleteView):
-    pass
+    query_budget = 9
 
 
 class CommentCreateView(CommentMixin, CreateView):
+    query_budget = 7
+
     def form_valid(self, form):
         get_object_or_404(Post, pk=self.kwargs['post_id'])
         form.instance.author = self.request.user
@@ -164,8 +286,41 @@ class CommentCreateView(CommentMixin, CreateView):
 
 
 class CommentUpdateView(CommentMixin, AuthMixin, UpdateView):
-    pass
+    query_budget = 6
 
 
 class CommentDeleteView(CommentMixin, AuthMixin, DeleteView):
-    pass
+    query_budget = 6
+
+
+class QueryStatsView(UserPassesTestMixin, TemplateView):
+    query_budget = 2
+    template_name = 'blog/query_stats.html'
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        sort = self.request.GET.get('sort')
+        if sort not in querystats.SORT_FIELDS:
+            sort = 'total'
+        context['sort'] = sort
+        context['sort_fields'] = querystats.SORT_FIELDS
+        context['entries'] = querystats.get_top(QUERY_STATS_LIMIT, sort)
+        context['is_process_local'] = not is_shared()
+        return context
+
+
+class MetricsView(View):
+    query_budget = 0
+
+    def get(self, request):
+        token = getattr(settings, 'BLOG_METRICS_TOKEN', None)
+        if not token or not constant_time_compare(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+        ):
+            raise Http404
+        return HttpResponse(
+            metrics.render(), content_type=metrics.CONTENT_TYPE
+        )
@@ -28,6 +28,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.MetricsMiddleware',
+    'blog.middleware.RequestTimingMiddleware',
+    'blog.middleware.QueryBudgetMiddleware',
+    'blog.middleware.QueryStatsMiddleware',
+    'blog.middleware.PrimaryStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +84,33 @@ DATABASES = {
     }
 }
 
+# Кэш должен быть общим для всех процессов приложения: версии фрагментов
+# и страниц меняются только в процессе, который выполнил запись.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+BLOG_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 268435456,
+    'temp_store': 'memory',
+    'auto_vacuum': 'incremental',
+}
+
+DATABASE_ROUTERS = [
+    'blog.routers.PrimaryReplicaRouter',
+]
+
+BLOG_REPLICA_DATABASES = []
+
+BLOG_REPLICA_STICKY_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -116,3 +148,31 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+BLOG_KEYSET_PAGINATION = False
+
+BLOG_PAGINATOR_COUNT_TIMEOUT = 60
+
+BLOG_PAGINATOR_COUNT_LIMIT = 10000
+
+BLOG_QUERY_BUDGET_RAISE = False
+
+BLOG_SERVER_TIMING = True
+
+BLOG_QUERY_STATS = True
+
+BLOG_SLOW_QUERY_MS = 100
+
+BLOG_QUERY_STATS_LIMIT = 1000
+
+BLOG_QUERY_STATS_PUBLISH_SECONDS = 10
+
+BLOG_METRICS_DIR = None
+
+BLOG_METRICS_FLUSH_SECONDS = 1
+
+BLOG_METRICS_TOKEN = None
+
+BLOG_FRAGMENT_TIMEOUT = 24 * 60 * 60
+
+BLOG_PAGE_CACHE_TIMEOUT = 5 * 60
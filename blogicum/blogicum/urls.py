@@ -3,7 +3,7 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from blog.views import RegistrationCreateView
+from blog.views import MetricsView, RegistrationCreateView
 
 
 urlpatterns = [
@@ -13,6 +13,7 @@ urlpatterns = [
     path('auth/registration/', RegistrationCreateView.as_view(),
          name='registration'),
     path('auth/', include('django.contrib.auth.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 handler404 = 'pages.views.page_not_found'
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,28 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(scope='session', autouse=True)
+def shared_cache(tmp_path_factory):
+    with override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': tmp_path_factory.mktemp('cache'),
+        }
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(shared_cache):
+    caches['default'].clear()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budget():
+    with override_settings(BLOG_QUERY_BUDGET_RAISE=True):
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
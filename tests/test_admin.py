@@ -0,0 +1,223 @@
+from io import StringIO
+from urllib.parse import quote
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = pytest.mark.django_db
+
+CHANGELISTS = (
+    '/admin/blog/post/',
+    '/admin/blog/post/?q=текст',
+    '/admin/blog/post/?author={username}',
+    '/admin/blog/post/?location={location}',
+    '/admin/blog/post/?category={category}',
+    '/admin/blog/comment/',
+    '/admin/blog/comment/?post={post_id}',
+    '/admin/blog/comment/?q={username}',
+)
+
+
+def add_rows(mixer, user, post):
+    mixer.cycle(5).blend(
+        'blog.Post',
+        author=user,
+        category=post.category,
+        text='Какой-то текст',
+    )
+    mixer.cycle(5).blend('blog.Comment', post=post, author=user)
+
+
+def get_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Убедитесь, что страница `{url}` админки открывается.'
+    )
+    return context.captured_queries
+
+
+@pytest.mark.parametrize('url', CHANGELISTS)
+def test_changelist_queries_do_not_grow(
+        admin_client, mixer, user, comment_to_a_post, url
+):
+    add_rows(mixer, user, comment_to_a_post.post)
+    post = comment_to_a_post.post
+    url = url.format(
+        username=user.username,
+        post_id=post.pk,
+        location=quote(post.location.name),
+        category=post.category.slug,
+    )
+    queries = get_queries(admin_client, url)
+    assert not any(
+        'DISTINCT' in query['sql'] for query in queries
+    ), 'Убедитесь, что списки в админке не строят DISTINCT-запросы.'
+    assert not any(
+        '"blog_post"."text"' in query['sql'] for query in queries
+    ), 'Убедитесь, что списки в админке не загружают полный текст постов.'
+    assert not any(
+        f'FROM "{table}"' in query['sql']
+        for query in queries
+        for table in ('blog_location', 'blog_category')
+    ), (
+        'Убедитесь, что фильтры списка в админке не загружают все '
+        'местоположения и категории.'
+    )
+    count = len(queries)
+
+    add_rows(mixer, user, comment_to_a_post.post)
+    assert len(get_queries(admin_client, url)) == count, (
+        'Убедитесь, что количество запросов к списку в админке '
+        'не зависит от количества строк.'
+    )
+
+
+def test_post_changelist_shows_thumbnail(
+        admin_client, post_with_published_location
+):
+    content = admin_client.get('/admin/blog/post/').content.decode('utf-8')
+    assert 'thumbnails/80x60/' in content, (
+        'Убедитесь, что в списке постов в админке выводятся уменьшенные '
+        'копии изображений.'
+    )
+
+
+def run_action(admin_client, model, action, objects, query='', **data):
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.post(f'/admin/blog/{model}/{query}', {
+            'action': action,
+            '_selected_action': [obj.pk for obj in objects],
+            **data,
+        })
+    assert response.status_code == 302
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(('UPDATE', 'DELETE'))
+    ]
+
+
+def test_unpublish_posts_runs_one_update(
+        admin_client, mixer, user, published_category
+):
+    posts = mixer.cycle(5).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    writes = run_action(admin_client, 'post', 'unpublish', posts)
+    assert len(writes) == 1, (
+        'Убедитесь, что снятие постов с публикации выполняется одним '
+        'запросом UPDATE.'
+    )
+    assert not Post.objects.filter(is_published=True).exists()
+    assert not Post.objects.visible().exists()
+    assert not Post.objects.exclude(rendered_html={}).exists()
+
+    run_action(admin_client, 'post', 'publish', posts[:2])
+    assert Post.objects.visible().count() == 2
+
+
+def test_unpublish_authors_posts(
+        admin_client, mixer, user, another_user, published_category
+):
+    own_posts = mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    other_post = mixer.blend(
+        'blog.Post', author=another_user, category=published_category
+    )
+    run_action(admin_client, 'post', 'unpublish_authors', own_posts[:1])
+    assert list(Post.objects.visible()) == [other_post], (
+        'Убедитесь, что действие снимает с публикации все посты авторов '
+        'выбранных постов.'
+    )
+
+
+def test_unpublish_category_hides_posts(
+        admin_client, mixer, user, published_category
+):
+    mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    run_action(
+        admin_client, 'category', 'unpublish', [published_category]
+    )
+    assert not Post.objects.visible().exists(), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты.'
+    )
+
+
+@pytest.mark.parametrize('is_published, action', (
+    (False, 'publish'), (True, 'unpublish')
+))
+def test_category_action_with_published_filter(
+        admin_client, mixer, user, is_published, action
+):
+    category = mixer.blend('blog.Category', is_published=is_published)
+    mixer.cycle(3).blend('blog.Post', author=user, category=category)
+    run_action(
+        admin_client, 'category', action, [category],
+        query=f'?is_published__exact={int(is_published)}'
+    )
+    assert Post.objects.visible().exists() != is_published, (
+        'Убедитесь, что действие с включённым фильтром по публикации '
+        'обновляет видимость постов категории.'
+    )
+    assert not Post.objects.exclude(rendered_html={}).exists()
+
+
+def test_post_publish_with_published_filter(
+        admin_client, mixer, user, published_category
+):
+    posts = mixer.cycle(3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=False
+    )
+    Post.objects.update(rendered_html={'card': 'устаревшая карточка'})
+    run_action(
+        admin_client, 'post', 'publish', posts,
+        query='?is_published__exact=0'
+    )
+    assert Post.objects.visible().count() == 3
+    assert not Post.objects.exclude(rendered_html={}).exists(), (
+        'Убедитесь, что действие с включённым фильтром сбрасывает '
+        'сохранённый HTML выбранных постов.'
+    )
+
+
+@pytest.mark.parametrize('action', ('delete_authors_comments',
+                                    'delete_selected'))
+def test_comment_deletion_recounts_posts(
+        admin_client, mixer, user, another_user, comment_to_a_post, action
+):
+    post = comment_to_a_post.post
+    comments = mixer.cycle(3).blend('blog.Comment', post=post, author=user)
+    mixer.blend('blog.Comment', post=post, author=another_user)
+    writes = run_action(
+        admin_client, 'comment', action, comments[:2], post='yes'
+    )
+    assert len(writes) == 2, (
+        'Убедитесь, что удаление комментариев выполняется одним запросом '
+        'DELETE и одним пересчётом счётчиков.'
+    )
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count(), (
+        'Убедитесь, что после удаления комментариев пересчитывается '
+        'количество комментариев у постов.'
+    )
+
+
+def test_benchadmin_removes_its_superuser():
+    out = StringIO()
+    call_command('benchadmin', rows=3, repeat=1, stdout=out)
+    assert 'комментарии к посту' in out.getvalue()
+    assert not get_user_model().objects.filter(is_superuser=True).exists(), (
+        'Убедитесь, что команда `benchadmin` удаляет временного '
+        'суперпользователя после замеров.'
+    )
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+pytestmark = pytest.mark.django_db
+
+
+def test_benchblog_measures_all_routes(
+        tmp_path, comment_to_a_post, another_user
+):
+    output = tmp_path / 'bench.json'
+    call_command('benchblog', requests=2, warmup=0, output=str(output))
+    results = json.loads(output.read_text(encoding='utf-8'))
+
+    for role in ('anonymous', 'author', 'another_user'):
+        for route in ('blog:index', 'blog:post_detail', 'blog:edit_comment',
+                      'pages:about'):
+            assert f'{role} {route}' in results, (
+                f'Убедитесь, что команда `benchblog` измеряет страницу '
+                f'`{route}` для роли `{role}`.'
+            )
+    detail = results['anonymous blog:post_detail']
+    assert detail['status'] == 200
+    assert detail['queries'] > 0
+    assert detail['template_ms'] > 0
+    assert detail['p95'] >= detail['p50']
+
+
+def test_benchblog_no_cache_skips_page_cache(
+        tmp_path, post_with_published_location
+):
+    output = tmp_path / 'bench.json'
+    call_command(
+        'benchblog', requests=2, warmup=1, no_cache=True, output=str(output)
+    )
+    results = json.loads(output.read_text(encoding='utf-8'))
+    assert results['anonymous blog:index']['queries'] > 0, (
+        'Убедитесь, что с `--no-cache` команда `benchblog` измеряет '
+        'страницы без кэша.'
+    )
+
+
+def test_benchblog_compare_flags_regressions(tmp_path):
+    result = {
+        'url': '/', 'status': 200, 'p50': 10, 'p95': 20,
+        'queries': 2, 'sql_ms': 1, 'template_ms': 5,
+    }
+    baseline = tmp_path / 'baseline.json'
+    current = tmp_path / 'current.json'
+    baseline.write_text(json.dumps({'anonymous blog:index': result}))
+    current.write_text(json.dumps({'anonymous blog:index': result}))
+    call_command('benchblog', compare=[str(baseline), str(current)])
+
+    current.write_text(json.dumps(
+        {'anonymous blog:index': {**result, 'queries': 3}}
+    ))
+    with pytest.raises(CommandError):
+        call_command('benchblog', compare=[str(baseline), str(current)])
@@ -0,0 +1,160 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location, CommentModel
+):
+    post = post_with_published_location
+    user_client.post(
+        f'/posts/{post.id}/comment/', data={'text': 'Первый комментарий'}
+    )
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при создании комментария увеличивается '
+        'сохранённое количество комментариев публикации.'
+    )
+
+    comment = CommentModel.objects.get(post=post)
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        'сохранённое количество комментариев публикации.'
+    )
+
+
+def test_comment_count_follows_cascade(
+        mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что количество комментариев пересчитывается при '
+        'каскадном удалении комментариев.'
+    )
+
+
+def count_recounts(queries):
+    return sum(
+        query['sql'].startswith('UPDATE') and 'comment_count' in query['sql']
+        for query in queries
+    )
+
+
+def test_post_cascade_skips_comment_recount(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    assert count_recounts(queries) == 0, (
+        'Убедитесь, что при удалении публикации счётчик не обновляется '
+        'отдельно для каждого удаляемого комментария.'
+    )
+
+
+def test_author_cascade_recounts_once(
+        mixer, user, another_user, PostModel, post_with_published_location
+):
+    posts = [
+        post_with_published_location,
+        mixer.blend('blog.Post', author=user),
+    ]
+    own_post = mixer.blend('blog.Post', author=another_user)
+    for post in posts + [own_post]:
+        mixer.cycle(2).blend('blog.Comment', post=post, author=another_user)
+    mixer.blend('blog.Comment', post=posts[0])
+
+    with CaptureQueriesContext(connection) as queries:
+        another_user.delete()
+    assert count_recounts(queries) == 1, (
+        'Убедитесь, что при удалении пользователя количество комментариев '
+        'пересчитывается одним запросом.'
+    )
+    assert list(
+        PostModel.objects.filter(pk__in=[post.pk for post in posts])
+        .order_by('pk').values_list('comment_count', flat=True)
+    ) == [1, 0]
+
+
+def test_failed_post_delete_keeps_comment_recount(
+        mixer, CommentModel, PostModel, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+
+    def fail(sender, instance, **kwargs):
+        raise RuntimeError
+
+    pre_delete.connect(fail, sender=PostModel)
+    try:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            post.delete()
+    finally:
+        pre_delete.disconnect(fail, sender=PostModel)
+
+    CommentModel.objects.filter(post=post).first().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что неудачное удаление публикации не мешает '
+        'пересчитывать количество комментариев в дальнейшем.'
+    )
+
+
+def test_delete_and_recount_sends_signals(
+        mixer, CommentModel, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    deleted = []
+
+    def remember(sender, instance, **kwargs):
+        deleted.append(instance.pk)
+
+    post_delete.connect(remember, sender=CommentModel)
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            CommentModel.objects.filter(
+                pk__in=CommentModel.objects.values('pk')[:2]
+            ).delete_and_recount()
+    finally:
+        post_delete.disconnect(remember, sender=CommentModel)
+
+    post.refresh_from_db()
+    assert len(deleted) == 2, (
+        'Убедитесь, что при массовом удалении комментариев отправляются '
+        'сигналы об удалении.'
+    )
+    assert count_recounts(queries) == 1
+    assert post.comment_count == 1, (
+        'Убедитесь, что при массовом удалении комментариев количество '
+        'комментариев пересчитывается.'
+    )
+
+
+def test_recount_comments_fixes_drift(
+        mixer, PostModel, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command('recount_comments', chunk_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что команда `recount_comments` исправляет '
+        'расхождения в количестве комментариев.'
+    )
@@ -0,0 +1,172 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+
+from blog.models import Post
+
+pytestmark = pytest.mark.django_db
+
+
+def get_urls(post):
+    return (
+        reverse('blog:index'),
+        reverse('blog:post_detail', kwargs={'pk': post.pk}),
+        reverse('blog:category_posts',
+                kwargs={'category_slug': post.category.slug}),
+        reverse('blog:profile', kwargs={'username': post.author.username}),
+    )
+
+
+@pytest.mark.parametrize('client_name', ('client', 'user_client'))
+def test_pages_answer_not_modified(
+        request, client_name, post_with_published_location,
+        django_assert_max_num_queries
+):
+    client = request.getfixturevalue(client_name)
+    for url in get_urls(post_with_published_location):
+        etag = client.get(url)['ETag']
+        with django_assert_max_num_queries(
+            3, info=f'Ответ 304 для `{url}` выполняет лишние запросы.'
+        ):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Убедитесь, что `{url}` отвечает 304 на совпавший ETag.'
+        )
+        assert not response.templates, (
+            f'Убедитесь, что `{url}` не отрисовывает шаблоны для ответа 304.'
+        )
+        assert response['ETag'] == etag
+
+
+def test_etag_differs_between_users(
+        client, user_client, another_user_client, post_with_published_location
+):
+    url = reverse('blog:index')
+    etags = {
+        client.get(url)['ETag'],
+        user_client.get(url)['ETag'],
+        another_user_client.get(url)['ETag'],
+    }
+    assert len(etags) == 3, (
+        'Убедитесь, что ETag учитывает пользователя, для которого '
+        'отрисована страница.'
+    )
+
+
+def test_new_comment_changes_etag(
+        client, user_client, post_with_published_location
+):
+    urls = get_urls(post_with_published_location)
+    etags = [client.get(url)['ETag'] for url in urls]
+    user_client.post(
+        reverse('blog:add_comment',
+                kwargs={'post_id': post_with_published_location.pk}),
+        data={'text': 'Новый комментарий'}
+    )
+    for url, etag in zip(urls, etags):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что после комментария `{url}` отдаётся заново.'
+        )
+        assert response['ETag'] != etag
+
+
+def test_location_change_changes_etag(
+        client, post_with_published_location
+):
+    url = reverse('blog:index')
+    etag = client.get(url)['ETag']
+    location = post_with_published_location.location
+    location.name = 'Новое место'
+    location.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert 'Новое место' in response.content.decode('utf-8')
+
+
+def test_deleted_post_changes_feed_etag(
+        client, mixer, user, post_with_published_location
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=post_with_published_location.category,
+        pub_date=post_with_published_location.pub_date - timedelta(days=1)
+    )
+    url = reverse('blog:index')
+    etag = client.get(url)['ETag']
+    post.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        'Убедитесь, что удаление публикации меняет ETag ленты.'
+    )
+
+
+def test_post_detail_sends_last_modified(
+        client, post_with_published_location
+):
+    url = reverse('blog:post_detail',
+                  kwargs={'pk': post_with_published_location.pk})
+    response = client.get(url)
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert response['Last-Modified'] == http_date(
+        int(post.updated_at.timestamp())
+    )
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == 304, (
+        'Убедитесь, что страница поста отвечает 304 на If-Modified-Since.'
+    )
+
+
+def test_hidden_post_is_not_answered_with_not_modified(
+        client, user_client, post_with_published_location
+):
+    url = reverse('blog:post_detail',
+                  kwargs={'pk': post_with_published_location.pk})
+    etag = client.get(url)['ETag']
+    Post.objects.filter(pk=post_with_published_location.pk).set_published(
+        False
+    )
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+
+def test_post_edit_updates_timestamp(post_with_published_location):
+    updated_at = post_with_published_location.updated_at
+    post_with_published_location.title = 'Новый заголовок'
+    post_with_published_location.save(update_fields=['title'])
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.updated_at > updated_at, (
+        'Убедитесь, что при изменении публикации обновляется `updated_at`.'
+    )
+
+
+def test_new_login_changes_etag(
+        client, user, post_with_published_location
+):
+    url = reverse('blog:post_detail',
+                  kwargs={'pk': post_with_published_location.pk})
+    client.force_login(user)
+    etag = client.get(url)['ETag']
+    client.logout()
+    client.force_login(user)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        'Убедитесь, что после повторного входа страница отдаётся заново: '
+        'в формах должен быть новый CSRF-токен.'
+    )
+
+
+def test_profile_edit_changes_profile_etag(
+        user_client, user, post_with_published_location
+):
+    url = reverse('blog:profile', kwargs={'username': user.username})
+    etag = user_client.get(url)['ETag']
+    user.first_name = 'Новое имя'
+    user.save()
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200, (
+        'Убедитесь, что изменение профиля меняет ETag страницы профиля.'
+    )
@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+LONG_TEXT = ' '.join(f'слово{number}' for number in range(450))
+
+
+@pytest.fixture
+def long_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category, text=LONG_TEXT
+    )
+
+
+def test_excerpt_and_reading_time_are_stored(long_post):
+    assert long_post.excerpt == (
+        'слово0 слово1 слово2 слово3 слово4 '
+        'слово5 слово6 слово7 слово8 слово9 …'
+    ), 'Убедитесь, что при сохранении поста вычисляется его отрывок.'
+    assert long_post.reading_time == 3
+
+    long_post.text = 'Короткий текст'
+    long_post.save(update_fields=('text',))
+    long_post.refresh_from_db()
+    assert long_post.excerpt == 'Короткий текст'
+    assert long_post.reading_time == 1
+
+
+def test_feed_does_not_load_post_text(client, long_post):
+    with CaptureQueriesContext(connection) as context:
+        content = client.get('/').content.decode('utf-8')
+    assert long_post.excerpt in content
+    assert not any(
+        '"blog_post"."text"' in query['sql']
+        for query in context.captured_queries
+    ), 'Убедитесь, что лента не загружает полный текст публикаций.'
@@ -0,0 +1,74 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils.timezone import now
+
+from blog.models import Post
+
+pytestmark = pytest.mark.django_db
+
+
+def read_export(directory, name):
+    with gzip.open(directory / f'{name}.jsonl.gz', 'rt',
+                   encoding='utf-8') as stream:
+        return [json.loads(line) for line in stream]
+
+
+def test_export_writes_all_tables(tmp_path, comment_to_a_post):
+    call_command('exportblog', output_dir=str(tmp_path), chunk_size=1)
+    posts = read_export(tmp_path, 'posts')
+    assert [post['id'] for post in posts] == [comment_to_a_post.post_id], (
+        'Убедитесь, что команда `exportblog` выгружает публикации.'
+    )
+    assert read_export(tmp_path, 'comments')[0]['text'] == (
+        comment_to_a_post.text
+    )
+    users = read_export(tmp_path, 'users')
+    assert users and all('password' not in user for user in users), (
+        'Убедитесь, что в выгрузку не попадают пароли пользователей.'
+    )
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_export_since(tmp_path, mixer, user, published_category):
+    old_post, new_post = mixer.cycle(2).blend(
+        'blog.Post', author=user, category=published_category
+    )
+    Post.objects.filter(pk=old_post.pk).update(
+        created_at=now() - timedelta(days=2),
+        updated_at=now() - timedelta(days=2)
+    )
+    call_command(
+        'exportblog',
+        output_dir=str(tmp_path),
+        since=(now() - timedelta(days=1)).isoformat(),
+        only=['posts'],
+    )
+    assert [post['id'] for post in read_export(tmp_path, 'posts')] == [
+        new_post.id
+    ], 'Убедитесь, что `--since` выгружает только новые записи.'
+
+
+def test_export_since_includes_edited(
+        tmp_path, mixer, user, published_category
+):
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    Post.objects.filter(pk=post.pk).update(
+        created_at=now() - timedelta(days=2),
+        updated_at=now() - timedelta(days=2)
+    )
+    post.refresh_from_db()
+    post.title = 'Исправленный заголовок'
+    post.save()
+    call_command(
+        'exportblog',
+        output_dir=str(tmp_path),
+        since=(now() - timedelta(days=1)).isoformat(),
+        only=['posts'],
+    )
+    assert [post['title'] for post in read_export(tmp_path, 'posts')] == [
+        'Исправленный заголовок'
+    ], 'Убедитесь, что `--since` выгружает и изменённые записи.'
@@ -0,0 +1,73 @@
+import gzip
+import json
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.serializers.base import DeserializationError
+
+from blog.models import Category, Location, Post
+
+pytestmark = pytest.mark.django_db
+
+FIXTURE = settings.BASE_DIR / 'db.json'
+EXCLUDE = ['auth.permission', 'admin.logentry', 'sessions']
+
+
+@pytest.fixture
+def dump():
+    with open(FIXTURE, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def get_rows(dump, model):
+    return {item['pk']: item['fields'] for item in dump
+            if item['model'] == model}
+
+
+def test_fastload_loads_dump(dump):
+    call_command('fastload', str(FIXTURE), batch_size=7, exclude=EXCLUDE)
+
+    for model, label in (
+        (get_user_model(), 'auth.user'),
+        (Category, 'blog.category'),
+        (Location, 'blog.location'),
+        (Post, 'blog.post'),
+    ):
+        assert model.objects.count() == len(get_rows(dump, label)), (
+            f'Убедитесь, что команда `fastload` загружает все объекты '
+            f'модели `{label}`.'
+        )
+    posts = get_rows(dump, 'blog.post')
+    post = Post.objects.get(pk=1)
+    assert post.created_at.isoformat().startswith(
+        posts[1]['created_at'][:19]
+    ), 'Убедитесь, что команда `fastload` сохраняет даты из дампа.'
+    assert post.excerpt
+    assert set(Post.objects.visible()) == set(
+        Post.objects.filter(Post.objects.visibility_predicate())
+    ), 'Убедитесь, что после загрузки пересчитывается видимость постов.'
+
+
+def test_fastload_reads_gzip(tmp_path, dump):
+    path = tmp_path / 'dump.json.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as stream:
+        json.dump(
+            [item for item in dump
+             if item['model'].startswith(('auth.user', 'blog.'))],
+            stream
+        )
+    call_command('fastload', str(path), exclude=EXCLUDE)
+    assert Post.objects.count() == len(get_rows(dump, 'blog.post'))
+
+
+def test_fastload_rejects_truncated_dump(tmp_path):
+    path = tmp_path / 'dump.json'
+    path.write_text(
+        '[{"model": "blog.location", "pk": 1, "fields": {"name": "Место"}}, '
+        '{"model": "blog.location", "pk": 2, "fields": {"na',
+        encoding='utf-8'
+    )
+    with pytest.raises(DeserializationError):
+        call_command('fastload', str(path))
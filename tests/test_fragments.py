@@ -0,0 +1,193 @@
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+
+from blog import caching, fragments
+from blog.models import Comment, Post
+
+pytestmark = pytest.mark.django_db
+
+LOCAL_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+@pytest.fixture(autouse=True)
+def stored_keys(monkeypatch):
+    keys = []
+    store = fragments.store
+
+    def record(entries):
+        keys.extend(entries)
+        store(entries)
+
+    monkeypatch.setattr(fragments, 'store', record)
+    return keys
+
+
+def get_content(client, url):
+    return client.get(url).content.decode('utf-8')
+
+
+def count_fragments(keys, kind):
+    return len({key for key in keys if f'blog:fragment:{kind}:' in key})
+
+
+def test_post_cards_are_cached(
+        client, post_with_published_location, stored_keys
+):
+    get_content(client, '/')
+    assert count_fragments(stored_keys, 'card') == 1, (
+        'Убедитесь, что карточки постов в ленте кэшируются.'
+    )
+    assert post_with_published_location.title in get_content(client, '/')
+
+
+def test_post_card_follows_post_category_and_location(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    get_content(client, '/')
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert post.title in get_content(client, '/')
+
+    post.category.title = 'Новая категория'
+    post.category.save()
+    assert post.category.title in get_content(client, '/')
+
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert post.location.name in get_content(client, '/')
+
+    post.author.username = 'renamed_author'
+    post.author.save()
+    assert '@renamed_author' in get_content(client, '/')
+
+
+def test_post_card_follows_comment_count(
+        client, user, post_with_published_location
+):
+    get_content(client, '/')
+    Comment.objects.create(
+        post=post_with_published_location, author=user, text='Комментарий'
+    )
+    assert 'Комментарии (1)' in get_content(client, '/')
+
+
+def test_post_card_follows_set_published(
+        user_client, post_with_published_location
+):
+    url = reverse(
+        'blog:profile',
+        kwargs={'username': post_with_published_location.author}
+    )
+    get_content(user_client, url)
+    Post.objects.filter(pk=post_with_published_location.pk).set_published(
+        False
+    )
+    assert 'Пост снят с публикации админом' in get_content(user_client, url)
+
+
+def test_header_is_cached_per_user(client, user_client, user, stored_keys):
+    assert 'Войти' in get_content(client, '/')
+    assert f'@{user.username}' not in get_content(client, '/')
+    assert user.username in get_content(user_client, '/')
+    assert count_fragments(stored_keys, 'header') == 2, (
+        'Убедитесь, что шапка кэшируется отдельно для анонимных '
+        'и авторизованных пользователей.'
+    )
+    user.username = 'renamed_user'
+    user.save()
+    assert 'renamed_user' in get_content(user_client, '/')
+
+
+def test_comments_are_cached_per_viewer(
+        user, user_client, another_user_client, comment_to_a_post
+):
+    url = reverse(
+        'blog:post_detail', kwargs={'pk': comment_to_a_post.post_id}
+    )
+    comment_to_a_post.author = user
+    comment_to_a_post.save()
+    assert 'Отредактировать комментарий' in get_content(user_client, url)
+    assert 'Отредактировать комментарий' not in get_content(
+        another_user_client, url
+    )
+
+    comment_to_a_post.text = 'Исправленный комментарий'
+    comment_to_a_post.save()
+    assert comment_to_a_post.text in get_content(another_user_client, url)
+
+    Comment.objects.filter(pk=comment_to_a_post.pk).delete_and_recount()
+    assert comment_to_a_post.text not in get_content(
+        another_user_client, url
+    )
+
+
+def test_cached_fragments_skip_rendering(
+        client, post_with_published_location
+):
+    first = client.get('/')['Server-Timing']
+    second = client.get('/')['Server-Timing']
+    for name in ('post_card', 'header'):
+        assert f'tpl-includes-{name}.html' in first
+        assert f'tpl-includes-{name}.html' not in second, (
+            f'Убедитесь, что при повторном запросе шаблон `{name}.html` '
+            'берётся из кэша, а не отрисовывается заново.'
+        )
+
+
+def test_comment_list_follows_commenter_rename(
+        client, another_user, mixer, post_with_published_location
+):
+    mixer.blend(
+        'blog.Comment', post=post_with_published_location,
+        author=another_user
+    )
+    url = reverse(
+        'blog:post_detail', kwargs={'pk': post_with_published_location.pk}
+    )
+    etag = client.get(url)['ETag']
+    another_user.set_password('новый-пароль')
+    another_user.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+        'Убедитесь, что сохранение пользователя без смены имени '
+        'не сбрасывает кэш комментариев.'
+    )
+
+    another_user.username = 'renamed_commenter'
+    another_user.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert '@renamed_commenter' in response.content.decode('utf-8'), (
+        'Убедитесь, что после смены имени автора комментария список '
+        'комментариев перерисовывается.'
+    )
+
+
+def test_versions_are_shared_between_processes(monkeypatch):
+    name = fragments.get_name('post', 1)
+    version = caching.get_version(name)
+    monkeypatch.setattr(
+        caching, 'cache', caches.create_connection('default')
+    )
+    caching.bump_version(name)
+    monkeypatch.undo()
+    assert caching.get_version(name) != version, (
+        'Убедитесь, что сброс версии фрагмента виден всем процессам: '
+        'кэш должен быть общим.'
+    )
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+def test_process_local_cache_is_not_used_for_fragments(
+        user_client, post_with_published_location
+):
+    get_content(user_client, '/')
+    second = user_client.get('/')['Server-Timing']
+    assert 'tpl-includes-post_card.html' in second, (
+        'Убедитесь, что фрагменты не кэшируются в кэше отдельного процесса.'
+    )
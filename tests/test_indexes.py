@@ -0,0 +1,64 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.models import Comment
+from blog.views import CategoryListView, IndexListView, ProfileListView
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Проверяется план запросов SQLite.'
+    ),
+]
+
+
+def get_view_queryset(view_class, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def assert_uses_index(queryset, index_name):
+    plan = queryset.explain()
+    assert f'INDEX {index_name}' in plan, (
+        f'Убедитесь, что запрос использует индекс `{index_name}`. '
+        f'План запроса:\n{plan}'
+    )
+
+
+def test_index_feed_uses_index(post_with_published_location):
+    assert_uses_index(
+        get_view_queryset(IndexListView), 'post_visible_feed_idx'
+    )
+
+
+def test_category_feed_uses_index(post_with_published_location):
+    assert_uses_index(
+        get_view_queryset(
+            CategoryListView,
+            category_slug=post_with_published_location.category.slug
+        ),
+        'post_visible_category_idx'
+    )
+
+
+def test_profile_feed_uses_index(post_with_published_location):
+    assert_uses_index(
+        get_view_queryset(
+            ProfileListView,
+            username=post_with_published_location.author.username
+        ),
+        'post_author_pub_date_idx'
+    )
+
+
+def test_post_comments_use_index(comment_to_a_post):
+    assert_uses_index(
+        Comment.objects.filter(post_id=comment_to_a_post.post_id),
+        'comment_post_created_idx'
+    )
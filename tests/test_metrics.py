@@ -0,0 +1,146 @@
+import multiprocessing
+import re
+
+import pytest
+from django.urls import reverse
+
+from blog import metrics
+
+pytestmark = pytest.mark.django_db
+
+SAMPLE = re.compile(
+    r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)'
+    r'(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$'
+)
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+TOKEN = 'metrics-token'
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch, settings):
+    monkeypatch.setitem(metrics.state, 'pid', None)
+    settings.BLOG_METRICS_TOKEN = TOKEN
+
+
+def scrape(client):
+    response = client.get('/metrics', HTTP_AUTHORIZATION=f'Bearer {TOKEN}')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    families = {}
+    samples = {}
+    for line in response.content.decode('utf-8').splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            families[name] = kind
+            continue
+        if line.startswith('#'):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f'Некорректная строка метрик: {line}'
+        name = match['name']
+        family = re.sub(r'_(bucket|sum|count)$', '', name)
+        assert name in families or families.get(family) == 'histogram', (
+            f'Метрика `{name}` выводится без строки `# TYPE`.'
+        )
+        labels = tuple(LABEL.findall(match['labels'] or ''))
+        samples[name, labels] = float(match['value'])
+    for (name, labels), value in samples.items():
+        if not name.endswith('_count'):
+            continue
+        family = name[:-len('_count')]
+        buckets = sorted(
+            (
+                float(dict(bucket_labels)['le']), bucket_value
+            )
+            for (bucket_name, bucket_labels), bucket_value in samples.items()
+            if bucket_name == f'{family}_bucket'
+            and tuple(
+                pair for pair in bucket_labels if pair[0] != 'le'
+            ) == labels
+        )
+        counts = [count for _, count in buckets]
+        assert counts == sorted(counts), (
+            f'Бакеты гистограммы `{family}` должны быть накопительными.'
+        )
+        assert buckets[-1] == (float('inf'), value)
+    return families, samples
+
+
+def test_metrics_endpoint(client, user_client, post_with_published_location):
+    client.get(reverse('blog:index'))
+    client.get(reverse('blog:index'))
+    user_client.post(
+        reverse('blog:add_comment',
+                kwargs={'post_id': post_with_published_location.pk}),
+        data={'text': 'Комментарий'}
+    )
+    families, samples = scrape(client)
+
+    assert families['blogicum_request_duration_seconds'] == 'histogram'
+    index = (('view', 'blog:index'), ('method', 'GET'))
+    assert samples['blogicum_requests_total', (*index, ('status', '200'))] == 2
+    assert samples['blogicum_request_duration_seconds_count', index] == 2
+    assert samples['blogicum_db_queries_total', index] > 0
+    assert samples['blogicum_posts_created_total', ()] == 1
+    assert samples['blogicum_comments_created_total', ()] == 1
+    assert samples[
+        'blogicum_cache_requests_total',
+        (('cache', 'page'), ('result', 'hit'))
+    ] == 1
+    assert any(
+        name == 'process_resident_memory_bytes' and value > 0
+        for (name, _), value in samples.items()
+    )
+
+
+def record_in_child():
+    metrics.inc('blogicum_posts_created_total', (), 5)
+    metrics.observe(
+        'blogicum_request_duration_seconds',
+        (('view', 'blog:index'), ('method', 'GET')),
+        20
+    )
+    metrics.flush(force=True)
+
+
+def test_metrics_are_merged_across_processes(
+        client, settings, tmp_path, post_with_published_location
+):
+    settings.BLOG_METRICS_DIR = tmp_path
+    client.get(reverse('blog:index'))
+    child = multiprocessing.get_context('fork').Process(
+        target=record_in_child
+    )
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+
+    _, samples = scrape(client)
+    index = (('view', 'blog:index'), ('method', 'GET'))
+    assert samples['blogicum_posts_created_total', ()] == 6
+    assert samples['blogicum_request_duration_seconds_count', index] == 2
+    assert samples[
+        'blogicum_request_duration_seconds_bucket', (*index, ('le', '10'))
+    ] == 1
+    assert not any(
+        name == 'process_resident_memory_bytes'
+        and labels == (('pid', str(child.pid)),)
+        for name, labels in samples
+    ), 'Память завершившихся процессов не должна попадать в метрики.'
+
+
+@pytest.mark.parametrize('authorization', ('', 'Bearer wrong-token'))
+def test_metrics_are_not_public(client, authorization):
+    response = client.get(
+        '/metrics', HTTP_AUTHORIZATION=authorization, REMOTE_ADDR='127.0.0.1'
+    )
+    assert response.status_code == 404, (
+        'Убедитесь, что метрики доступны только по токену, '
+        'независимо от адреса клиента.'
+    )
+
+
+def test_metrics_are_disabled_without_token(client, settings):
+    settings.BLOG_METRICS_TOKEN = None
+    response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer None')
+    assert response.status_code == 404
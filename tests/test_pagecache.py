@@ -0,0 +1,159 @@
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from blog import pagecache
+from blog.models import Comment
+
+pytestmark = pytest.mark.django_db
+
+
+def get_urls(post):
+    return (
+        reverse('blog:index'),
+        reverse('blog:post_detail', kwargs={'pk': post.pk}),
+        reverse('blog:category_posts',
+                kwargs={'category_slug': post.category.slug}),
+        reverse('blog:profile', kwargs={'username': post.author.username}),
+    )
+
+
+def test_anonymous_pages_are_served_from_cache(
+        client, post_with_published_location, django_assert_num_queries
+):
+    for url in get_urls(post_with_published_location):
+        first = client.get(url)
+        with django_assert_num_queries(
+            0, info=f'Повторный анонимный запрос к `{url}` ходит в базу.'
+        ):
+            second = client.get(url)
+        assert second.status_code == 200
+        assert second.content == first.content
+
+
+def test_pages_are_cached_per_page_number(
+        client, many_posts_with_published_locations
+):
+    first = client.get(reverse('blog:index'))
+    second = client.get(reverse('blog:index'), {'page': 2})
+    assert first.content != second.content
+    assert client.get(
+        reverse('blog:index'), {'page': 2, 'utm_source': 'mail'}
+    ).content == second.content
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get(reverse('blog:index'))
+    response = user_client.get(reverse('blog:index'))
+    assert 'Написать пост' in response.content.decode('utf-8')
+    assert pagecache.get(
+        pagecache.get_key(response.wsgi_request, ('page',))
+    ) is None
+
+
+@pytest.mark.parametrize('change', ('post', 'category', 'location'))
+def test_cached_pages_follow_changes(
+        change, client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = get_urls(post)
+    for url in urls:
+        client.get(url)
+    changed = {
+        'post': post,
+        'category': post.category,
+        'location': post.location,
+    }[change]
+    field = 'name' if change == 'location' else 'title'
+    setattr(changed, field, f'Изменённое поле {change}')
+    changed.save()
+    for url in urls:
+        content = client.get(url).content.decode('utf-8')
+        assert f'Изменённое поле {change}' in content, (
+            f'Убедитесь, что кэш страницы `{url}` сбрасывается '
+            f'при изменении объекта `{change}`.'
+        )
+
+
+def test_cached_pages_follow_comments(
+        client, user, post_with_published_location
+):
+    post = post_with_published_location
+    index, detail = get_urls(post)[:2]
+    client.get(index)
+    client.get(detail)
+    Comment.objects.create(post=post, author=user, text='Новый комментарий')
+    assert 'Комментарии (1)' in client.get(index).content.decode('utf-8')
+    assert 'Новый комментарий' in client.get(detail).content.decode('utf-8')
+
+
+def test_responses_with_csrf_token_are_not_cached():
+    request = RequestFactory().get('/')
+    request.META['CSRF_COOKIE_USED'] = True
+    assert not pagecache.is_cacheable(request, HttpResponse('ok'))
+    assert pagecache.is_cacheable(RequestFactory().get('/'),
+                                  HttpResponse('ok'))
+
+
+def test_category_page_ignores_other_categories(
+        client, mixer, user, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    url = get_urls(post)[2]
+    client.get(url)
+    mixer.blend('blog.Post', author=user)
+    with django_assert_num_queries(
+        0, info='Публикация в другой категории сбросила кэш страницы.'
+    ):
+        client.get(url)
+
+
+@pytest.mark.parametrize('url_index', (0, 2, 3))
+def test_list_pages_follow_new_posts(
+        url_index, client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    url = get_urls(post)[url_index]
+    client.get(url)
+    mixer.blend(
+        'blog.Post',
+        author=post.author,
+        category=post.category,
+        pub_date=post.pub_date,
+        is_published=True,
+        title='Новая публикация',
+    )
+    assert 'Новая публикация' in client.get(url).content.decode('utf-8'), (
+        f'Убедитесь, что новая публикация сбрасывает кэш страницы `{url}`.'
+    )
+
+
+def test_list_pages_follow_moved_post(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    url = get_urls(post)[2]
+    client.get(url)
+    post.category = mixer.blend('blog.Category', is_published=True)
+    post.save()
+    assert post.title not in client.get(url).content.decode('utf-8'), (
+        'Убедитесь, что перенос публикации в другую категорию сбрасывает '
+        'кэш прежней категории.'
+    )
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+def test_process_local_cache_is_not_used_for_pages(
+        client, post_with_published_location
+):
+    url = get_urls(post_with_published_location)[0]
+    client.get(url)
+    assert client.get(url).context is not None, (
+        'Убедитесь, что страницы не кэшируются в кэше отдельного процесса.'
+    )
@@ -0,0 +1,140 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.paginators import ElidedPaginator
+from conftest import N_PER_PAGE
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def posts_with_same_pub_date(mixer, user, published_category):
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=datetime(2023, 1, 1, tzinfo=pytz.UTC),
+    )
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_all_posts(
+        client, posts_with_same_pub_date
+):
+    expected = [
+        post.id for post in
+        sorted(posts_with_same_pub_date, key=lambda post: -post.id)
+    ]
+    pages = []
+    url = '/'
+    while url:
+        page_obj = client.get(url).context['page_obj']
+        pages.append(page_obj)
+        url = page_obj.has_next() and f'/?after={page_obj.next_cursor}'
+
+    assert [post.id for page in pages for post in page] == expected, (
+        'Убедитесь, что при постраничном выводе по курсору все публикации '
+        'выводятся ровно один раз и в порядке убывания даты публикации.'
+    )
+    assert len(pages) == 3
+    assert not pages[0].has_previous()
+
+    previous_page = client.get(
+        f'/?before={pages[-1].previous_cursor}'
+    ).context['page_obj']
+    assert list(previous_page) == list(pages[-2]), (
+        'Убедитесь, что курсор `before` возвращает предыдущую страницу.'
+    )
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_rejects_invalid_cursor(
+        client, posts_with_same_pub_date
+):
+    response = client.get('/?after=not-a-cursor')
+    assert response.status_code == 404, (
+        'Убедитесь, что при некорректном курсоре возвращается статус 404.'
+    )
+
+
+def get_count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        page_obj = client.get(url).context['page_obj']
+    count_queries = [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql']
+    ]
+    return page_obj, count_queries
+
+
+def test_post_count_is_cached(
+        client, mixer, user, published_category, posts_with_same_pub_date
+):
+    page_obj, count_queries = get_count_queries(client, '/')
+    assert page_obj.paginator.count == len(posts_with_same_pub_date)
+    assert len(count_queries) == 1
+
+    page_obj, count_queries = get_count_queries(client, '/?page=2')
+    assert page_obj.paginator.count == len(posts_with_same_pub_date)
+    assert not count_queries, (
+        'Убедитесь, что количество публикаций для постраничного вывода '
+        'берётся из кеша.'
+    )
+
+    mixer.blend('blog.Post', author=user, category=published_category)
+    page_obj, count_queries = get_count_queries(client, '/')
+    assert page_obj.paginator.count == len(posts_with_same_pub_date) + 1, (
+        'Убедитесь, что кеш количества публикаций сбрасывается при '
+        'изменении публикаций.'
+    )
+
+
+@override_settings(BLOG_PAGINATOR_COUNT_LIMIT=N_PER_PAGE)
+def test_pages_beyond_count_limit_are_reachable(
+        client, posts_with_same_pub_date
+):
+    page_obj, count_queries = get_count_queries(client, '/')
+    assert page_obj.paginator.count == N_PER_PAGE, (
+        'Убедитесь, что без оценки количества строк используется '
+        'ограниченный подсчёт.'
+    )
+    assert len(count_queries) == 1, (
+        'Убедитесь, что количество публикаций не подсчитывается дважды.'
+    )
+    assert page_obj.has_next()
+    page_obj = client.get('/?page=3').context['page_obj']
+    assert len(page_obj) == 3, (
+        'Убедитесь, что страницы за лимитом подсчёта открываются.'
+    )
+    assert not page_obj.has_next()
+    assert client.get('/?page=4').status_code == 404
+
+
+def test_bulk_publish_resets_cached_count(
+        client, PostModel, posts_with_same_pub_date
+):
+    assert client.get('/').context['page_obj'].paginator.count == len(
+        posts_with_same_pub_date
+    )
+    PostModel.objects.filter(
+        pk=posts_with_same_pub_date[0].pk
+    ).set_published(False)
+    assert client.get('/').context['page_obj'].paginator.count == len(
+        posts_with_same_pub_date
+    ) - 1, (
+        'Убедитесь, что массовое снятие с публикации сбрасывает '
+        'кешированное количество публикаций.'
+    )
+
+
+def test_page_window_is_elided():
+    page = ElidedPaginator(range(1000), N_PER_PAGE).page(50)
+    assert page.page_window == [
+        1, 2, ElidedPaginator.ELLIPSIS, 47, 48, 49, 50, 51, 52, 53,
+        ElidedPaginator.ELLIPSIS, 99, 100
+    ]
@@ -0,0 +1,132 @@
+import logging
+
+import pytest
+from django.urls import reverse
+
+from blog.middleware import QueryBudgetExceeded
+from blog.views import IndexListView
+
+pytestmark = pytest.mark.django_db
+
+ANONYMOUS_PAGES = (
+    ('blog:index', 3),
+    ('blog:create_post', 0),
+    ('blog:edit_post', 1),
+    ('blog:delete_post', 1),
+    ('blog:edit_comment', 0),
+    ('blog:delete_comment', 0),
+    ('blog:post_detail', 4),
+    ('blog:category_posts', 3),
+    ('blog:search', 0),
+    ('blog:edit_profile', 0),
+    ('blog:profile', 4),
+)
+
+AUTHOR_PAGES = (
+    ('blog:index', 5),
+    ('blog:create_post', 4),
+    ('blog:edit_post', 5),
+    ('blog:delete_post', 4),
+    ('blog:edit_comment', 3),
+    ('blog:delete_comment', 3),
+    ('blog:post_detail', 6),
+    ('blog:category_posts', 5),
+    ('blog:search', 2),
+    ('blog:edit_profile', 2),
+    ('blog:profile', 5),
+)
+
+
+@pytest.fixture
+def author_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+
+
+def get_url(name, post, comment):
+    kwargs = {
+        'blog:edit_post': {'post_id': post.id},
+        'blog:delete_post': {'post_id': post.id},
+        'blog:edit_comment': {'post_id': post.id, 'comment_id': comment.id},
+        'blog:delete_comment': {'post_id': post.id, 'comment_id': comment.id},
+        'blog:add_comment': {'post_id': post.id},
+        'blog:post_detail': {'pk': post.id},
+        'blog:category_posts': {'category_slug': post.category.slug},
+        'blog:profile': {'username': post.author.username},
+    }.get(name, {})
+    return reverse(name, kwargs=kwargs)
+
+
+def assert_query_count(
+        django_assert_num_queries, client, method, url, expected
+):
+    with django_assert_num_queries(
+        expected,
+        info=(
+            f'Проверьте количество SQL-запросов при {method}-запросе '
+            f'к странице `{url}`.'
+        )
+    ):
+        getattr(client, method.lower())(url)
+
+
+@pytest.mark.parametrize('name, expected', ANONYMOUS_PAGES)
+def test_anonymous_query_count(
+        name, expected, client, author_comment, django_assert_num_queries
+):
+    assert_query_count(
+        django_assert_num_queries,
+        client,
+        'GET',
+        get_url(name, author_comment.post, author_comment),
+        expected
+    )
+
+
+@pytest.mark.parametrize('name, expected', AUTHOR_PAGES)
+def test_author_query_count(
+        name, expected, user_client, author_comment,
+        django_assert_num_queries
+):
+    assert_query_count(
+        django_assert_num_queries,
+        user_client,
+        'GET',
+        get_url(name, author_comment.post, author_comment),
+        expected
+    )
+
+
+def test_add_comment_query_count(
+        user_client, author_comment, django_assert_num_queries
+):
+    with django_assert_num_queries(7):
+        user_client.post(
+            get_url('blog:add_comment', author_comment.post, author_comment),
+            data={'text': 'Комментарий'}
+        )
+
+
+def test_query_budget_exceeded_raises(client, author_comment, monkeypatch):
+    monkeypatch.setattr(IndexListView, 'query_budget', 1)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(reverse('blog:index'))
+
+
+def test_query_budget_exceeded_is_logged(
+        client, author_comment, monkeypatch, settings, caplog
+):
+    monkeypatch.setattr(IndexListView, 'query_budget', 1)
+    settings.BLOG_QUERY_BUDGET_RAISE = False
+    with caplog.at_level(logging.WARNING, logger='blog.query_budget'):
+        response = client.get(reverse('blog:index'))
+    assert response.status_code == 200
+    assert any(
+        'IndexListView' in record.getMessage()
+        and 'SELECT' in record.getMessage()
+        for record in caplog.records
+    ), (
+        'Убедитесь, что при превышении бюджета SQL-запросов в журнал '
+        'записываются имя представления и выполненные запросы.'
+    )
@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from blog import querystats
+
+pytestmark = pytest.mark.django_db
+
+
+def test_fingerprint_normalizes_literals():
+    assert querystats.fingerprint(
+        "SELECT  *\n FROM blog_post WHERE id IN (1, 2, 3) "
+        "AND title = 'a''b' LIMIT 10"
+    ) == querystats.fingerprint(
+        'SELECT * FROM blog_post WHERE id IN (%s, %s) '
+        'AND title = %s LIMIT 20'
+    ) == (
+        'SELECT * FROM blog_post WHERE id IN (...) AND title = ? LIMIT ?'
+    )
+
+
+def test_query_stats_are_grouped_by_view(
+        user_client, post_with_published_location
+):
+    for _ in range(3):
+        user_client.get(reverse('blog:index'))
+    entries = [
+        entry for entry in querystats.get_top(100)
+        if entry['view'] == 'blog:index'
+    ]
+    assert entries, (
+        'Убедитесь, что статистика SQL-запросов связывает запросы '
+        'с вызвавшим их представлением.'
+    )
+    assert max(entry['count'] for entry in entries) == 3
+
+
+def test_slow_queries_are_explained(
+        client, post_with_published_location, settings
+):
+    settings.BLOG_SLOW_QUERY_MS = 0
+    client.get(reverse('blog:index'))
+    plans = [
+        entry['plan'] for entry in querystats.get_top(100)
+        if entry['view'] == 'blog:index'
+    ]
+    assert plans and all(plans), (
+        'Убедитесь, что для медленных запросов сохраняется вывод EXPLAIN.'
+    )
+
+
+def test_query_stats_page_is_staff_only(
+        admin_client, user_client, post_with_published_location
+):
+    user_client.get(reverse('blog:index'))
+    assert user_client.get(reverse('blog:query_stats')).status_code == 403
+    response = admin_client.get(reverse('blog:query_stats'), {'sort': 'max'})
+    assert response.status_code == 200
+    assert 'blog:index' in response.content.decode('utf-8')
+
+
+def test_querystats_command(post_with_published_location):
+    out = StringIO()
+    call_command(
+        'querystats', request=[reverse('blog:index')], repeat=2,
+        reset=True, stdout=out
+    )
+    assert 'blog:index' in out.getvalue()
+    assert not querystats.get_top()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+def test_querystats_warn_about_process_local_cache(admin_client):
+    out = StringIO()
+    call_command('querystats', stdout=out)
+    assert 'только этого процесса' in out.getvalue(), (
+        'Убедитесь, что команда `querystats` предупреждает, что при кэше '
+        'в памяти процесса статистика собрана только в этом процессе.'
+    )
+    response = admin_client.get(reverse('blog:query_stats'))
+    assert 'Кэш не общий' in response.content.decode('utf-8')
@@ -0,0 +1,201 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from PIL import Image
+
+from blog import rendering
+from blog.blog_constants import INDEX_POSTS_LIMITER
+from blog.models import Post
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def disable_fragment_and_page_caches(settings):
+    settings.BLOG_FRAGMENT_TIMEOUT = 0
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+
+
+def test_post_html_is_stored_on_save(post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    for kind in rendering.TEMPLATES:
+        assert post.rendered_html[kind]['version'] == (
+            rendering.get_template_version(kind)
+        ), 'Убедитесь, что при сохранении поста сохраняется его HTML.'
+    assert post.title in post.rendered_html['card']['html']
+
+
+def test_post_html_is_stored_with_the_post(post_with_published_location):
+    post = post_with_published_location
+    post.title = 'Новый заголовок'
+    with CaptureQueriesContext(connection) as queries:
+        post.save()
+    updates = [
+        query['sql'] for query in queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1 and 'rendered_html' in updates[0], (
+        'Убедитесь, что HTML поста сохраняется тем же запросом, '
+        'что и сам пост.'
+    )
+
+
+def test_feed_uses_stored_card(client, post_with_published_location):
+    content = client.get('/').content.decode('utf-8')
+    assert post_with_published_location.title in content
+    stats = rendering.get_stats()['card']
+    assert stats['hits'] == 1 and stats['misses'] == 0, (
+        'Убедитесь, что лента выводит сохранённый HTML карточки поста.'
+    )
+
+
+def test_stored_html_follows_category(
+        client, post_with_published_location
+):
+    category = post_with_published_location.category
+    category.title = 'Новое название категории'
+    category.save()
+
+    content = client.get('/').content.decode('utf-8')
+    assert category.title in content, (
+        'Убедитесь, что при изменении категории HTML карточки '
+        'перерисовывается.'
+    )
+    assert rendering.get_stats()['card']['misses'] == 1
+    client.get('/')
+    assert rendering.get_stats()['card']['hits'] == 1
+
+
+def test_rerendered_card_is_stored(client, post_with_published_location):
+    category = post_with_published_location.category
+    category.title = 'Новое название категории'
+    category.save()
+    client.get('/')
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert category.title in post.rendered_html['card']['html'], (
+        'Убедитесь, что перерисованная карточка сохраняется в базе.'
+    )
+
+
+def test_feed_refresh_keeps_stored_text(
+        client, post_with_published_location
+):
+    stored_text = Post.objects.get(
+        pk=post_with_published_location.pk
+    ).rendered_html['text']
+    Post.objects.update(rendered_html={'text': stored_text})
+    client.get('/')
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.rendered_html['text'] == stored_text, (
+        'Убедитесь, что перерисовка карточки в ленте не стирает '
+        'сохранённый HTML текста поста.'
+    )
+    assert 'card' in post.rendered_html
+
+
+@pytest.mark.parametrize('relation', ('location', 'category'))
+def test_stored_html_is_reset_on_related_delete(
+        post_with_published_location, relation
+):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    getattr(post, relation).delete()
+    post.refresh_from_db()
+    assert post.rendered_html == {}, (
+        'Убедитесь, что при удалении связанного объекта сохранённый HTML '
+        'публикации сбрасывается.'
+    )
+    assert post.updated_at > post_with_published_location.updated_at
+
+
+def test_author_save_without_changes_keeps_stored_html(
+        post_with_published_location
+):
+    author = post_with_published_location.author
+    author.set_password('новый-пароль')
+    author.save()
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert post.rendered_html != {}, (
+        'Убедитесь, что сохранение пользователя без изменения имени '
+        'не сбрасывает сохранённый HTML его публикаций.'
+    )
+    assert post.updated_at == post_with_published_location.updated_at
+
+    author.username = 'new_username'
+    author.save()
+    post.refresh_from_db()
+    assert post.rendered_html == {}, (
+        'Убедитесь, что при смене имени пользователя сохранённый HTML '
+        'его публикаций сбрасывается.'
+    )
+
+
+def test_stale_template_version_is_rerendered(
+        client, post_with_published_location
+):
+    Post.objects.update(text='Текст публикации', rendered_html={
+        kind: {'version': 'stale', 'html': 'Устаревший HTML'}
+        for kind in rendering.TEMPLATES
+    })
+    content = client.get(
+        f'/posts/{post_with_published_location.id}/'
+    ).content.decode('utf-8')
+    assert 'Устаревший HTML' not in content
+    assert 'Текст публикации' in content
+    assert rendering.get_stats()['text']['misses'] == 1
+
+
+def test_rendercache_rebuild(post_with_published_location):
+    rendering.invalidate(Post.objects.all())
+    call_command('rendercache', rebuild=True, verbosity=0)
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert set(post.rendered_html) == set(rendering.TEMPLATES)
+
+
+def test_stored_card_uses_saved_image_name(user_client, published_category):
+    image = BytesIO()
+    Image.new('RGB', (10, 10)).save(image, 'JPEG')
+    user_client.post('/posts/create/', {
+        'title': 'Пост с картинкой',
+        'text': 'Текст',
+        'pub_date': now().strftime('%Y-%m-%dT%H:%M'),
+        'category': published_category.pk,
+        'is_published': True,
+        'image': SimpleUploadedFile(
+            'photo.jpg', image.getvalue(), content_type='image/jpeg'
+        ),
+    })
+    post = Post.objects.get(title='Пост с картинкой')
+    assert post.image.name.startswith('posts_images/')
+    assert f'src="{post.image.url}"' in post.rendered_html['card']['html'], (
+        'Убедитесь, что сохранённая карточка ссылается на загруженный '
+        'файл изображения.'
+    )
+
+
+def test_render_stats_are_written_once_per_request(
+        client, monkeypatch, many_posts_with_published_locations
+):
+    rendering.flush_stats()
+    written = []
+    for method in ('add', 'incr'):
+        original = getattr(rendering.cache, method)
+
+        def spy(key, *args, original=original, **kwargs):
+            written.append(key)
+            return original(key, *args, **kwargs)
+
+        monkeypatch.setattr(rendering.cache, method, spy)
+    client.get('/')
+    stats = [key for key in written if key.startswith('blog:render:')]
+    assert len(stats) <= 2 * len(rendering.TEMPLATES) * len(
+        rendering.STATS
+    ), (
+        'Убедитесь, что счётчики сохранённого HTML записываются в кэш '
+        'один раз за запрос, а не для каждой карточки.'
+    )
+    assert rendering.get_stats()['card']['hits'] == INDEX_POSTS_LIMITER
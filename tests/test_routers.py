@@ -0,0 +1,102 @@
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+from blog.models import Category, Location, Post
+from blog.routers import PrimaryReplicaRouter, RoutingState, routing_state
+
+REPLICA = 'replica'
+
+
+@pytest.fixture
+def router_state():
+    token = routing_state.set(RoutingState())
+    yield routing_state.get()
+    routing_state.reset(token)
+
+
+@override_settings(BLOG_REPLICA_DATABASES=[REPLICA])
+def test_router_reads_from_replica_until_write(router_state):
+    router = PrimaryReplicaRouter()
+    assert router.db_for_read(Post) == REPLICA, (
+        'Убедитесь, что чтение направляется на реплику.'
+    )
+    assert router.db_for_write(Post) == 'default'
+    assert router.db_for_read(Post) == 'default', (
+        'Убедитесь, что после записи чтение идёт с основной базы.'
+    )
+
+
+def test_router_without_replicas_uses_primary(router_state):
+    assert PrimaryReplicaRouter().db_for_read(Post) == 'default'
+
+
+@pytest.fixture
+def replica_db(tmp_path, django_user_model, post_with_published_location):
+    connections.databases[REPLICA] = {
+        **connections.databases['default'],
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+        'TEST': {'NAME': str(tmp_path / 'replica.sqlite3')},
+    }
+    with override_settings(BLOG_REPLICA_DATABASES=[REPLICA]):
+        call_command('migrate', database=REPLICA, verbosity=0)
+        for model in (django_user_model, Session, Category, Location, Post):
+            model.objects.using(REPLICA).bulk_create(
+                model.objects.using('default').all()
+            )
+        yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.databases[REPLICA]
+
+
+@pytest.mark.django_db
+def test_comment_is_read_back_from_primary(
+        client, user_client, post_with_published_location, replica_db
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    text = 'Комментарий, который ещё не попал на реплику'
+    assert client.get(url).status_code == 200
+    response = user_client.post(
+        f'{url}comment/', data={'text': text}, follow=True
+    )
+    assert text in response.content.decode('utf-8'), (
+        'Убедитесь, что после добавления комментария автор сразу видит '
+        'его: чтение должно идти с основной базы.'
+    )
+    assert text not in client.get(url).content.decode('utf-8'), (
+        'Убедитесь, что чтение без недавней записи идёт с реплики.'
+    )
+
+
+@pytest.mark.django_db
+def test_primary_cookie_needs_replicas(
+        user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/comment/'
+    response = user_client.post(url, data={'text': 'Комментарий'})
+    assert 'blog_primary' not in response.cookies, (
+        'Убедитесь, что без реплик cookie привязки к основной базе '
+        'не устанавливается.'
+    )
+    with override_settings(BLOG_REPLICA_DATABASES=[REPLICA]):
+        response = user_client.post(url, data={'text': 'Комментарий'})
+    assert 'blog_primary' in response.cookies
+
+
+@pytest.mark.django_db
+def test_lazy_write_on_get_does_not_pin(
+        client, post_with_published_location, replica_db
+):
+    Post.objects.using(REPLICA).update(rendered_html={})
+    response = client.get(f'/posts/{post_with_published_location.id}/')
+    assert response.status_code == 200
+    assert Post.objects.get(
+        pk=post_with_published_location.pk
+    ).rendered_html, 'Проверьте, что при GET-запросе HTML был сохранён.'
+    assert 'blog_primary' not in response.cookies, (
+        'Убедитесь, что запись, сделанная при GET-запросе, не привязывает '
+        'посетителя к основной базе.'
+    )
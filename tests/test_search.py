@@ -0,0 +1,94 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def searchable_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        title='Прогулка по <набережной>',
+        text='Сегодня мы гуляли вдоль реки и кормили уток.',
+    )
+
+
+def search(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return response
+
+
+def test_search_finds_visible_posts(client, searchable_post, future_posts):
+    response = search(client, 'набережн')
+    assert list(response.context['page_obj']) == [searchable_post], (
+        'Убедитесь, что поиск находит опубликованные посты по началу слова.'
+    )
+    content = response.content.decode('utf-8')
+    assert '<mark>набережной</mark>' in content, (
+        'Убедитесь, что найденные слова подсвечиваются.'
+    )
+    assert '&lt;' in content and '<набережной>' not in content
+
+    future_posts[0].title = 'Набережная будущего'
+    future_posts[0].save()
+    assert list(search(client, 'набережн').context['page_obj']) == [
+        searchable_post
+    ], 'Убедитесь, что поиск не показывает скрытые публикации.'
+
+
+def test_search_index_follows_changes(client, searchable_post):
+    searchable_post.text = 'Вечером пошёл дождь.'
+    searchable_post.save()
+    assert not search(client, 'уток').context['page_obj']
+    assert list(search(client, 'дождь').context['page_obj']) == [
+        searchable_post
+    ]
+
+    searchable_post.delete()
+    assert not search(client, 'дождь').context['page_obj']
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Полнотекстовый индекс поддерживается только для SQLite.'
+)
+def test_rebuild_search_index(client, searchable_post):
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert not search(client, 'уток').context['page_obj']
+    call_command('rebuild_search_index', chunk_size=1)
+    assert list(search(client, 'уток').context['page_obj']) == [
+        searchable_post
+    ]
+
+
+class FailingStream:
+    def write(self, message):
+        raise OSError
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Полнотекстовый индекс поддерживается только для SQLite.'
+)
+def test_failed_rebuild_keeps_search_index(
+        mixer, user, published_category, searchable_post
+):
+    posts = [
+        searchable_post,
+        mixer.blend('blog.Post', author=user, category=published_category),
+    ]
+    with pytest.raises(OSError):
+        call_command(
+            'rebuild_search_index', chunk_size=1, stdout=FailingStream()
+        )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT rowid FROM blog_post_fts ORDER BY rowid')
+        assert cursor.fetchall() == [(post.pk,) for post in posts], (
+            'Убедитесь, что прерванная перестройка индекса не оставляет '
+            'его пустым.'
+        )
@@ -0,0 +1,59 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+
+from blog.models import Comment, Post
+
+pytestmark = pytest.mark.django_db
+
+SEED_OPTIONS = {
+    'users': 5,
+    'categories': 12,
+    'locations': 2,
+    'posts': 30,
+    'comments_per_post': 2,
+    'chunk_size': 7,
+}
+
+
+def seed(**options):
+    call_command('seedblog', **SEED_OPTIONS, **options)
+
+
+def test_seedblog_fills_database():
+    seed()
+    assert Post.objects.count() == SEED_OPTIONS['posts']
+    assert Comment.objects.count() == 60
+    assert Post.objects.aggregate(
+        total=Sum('comment_count')
+    )['total'] == 60, (
+        'Убедитесь, что после заполнения пересчитываются счётчики '
+        'комментариев.'
+    )
+    assert set(Post.objects.visible()) == set(
+        Post.objects.filter(Post.objects.visibility_predicate())
+    ), 'Убедитесь, что видимость сгенерированных постов согласована.'
+
+
+def test_seedblog_is_deterministic():
+    seed(seed=7)
+    first = list(Post.objects.order_by('pk').values_list('title', 'text'))
+    seed(seed=7)
+    second = list(
+        Post.objects.order_by('pk').values_list('title', 'text')
+    )[len(first):]
+    assert first == second, (
+        'Убедитесь, что при одинаковом `--seed` генерируются одинаковые '
+        'данные.'
+    )
+
+
+@pytest.mark.parametrize('option', ('users', 'categories', 'locations'))
+def test_seedblog_requires_references(option):
+    with pytest.raises(CommandError):
+        call_command('seedblog', **{**SEED_OPTIONS, option: 0})
+    assert not Post.objects.exists(), (
+        'Убедитесь, что команда `seedblog` проверяет число пользователей, '
+        'категорий и местоположений до заполнения базы.'
+    )
@@ -0,0 +1,51 @@
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Проверяются настройки SQLite.'
+    ),
+]
+
+
+def test_sqlite_pragmas_are_applied():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout = cursor.fetchone()[0]
+    assert busy_timeout == settings.BLOG_SQLITE_PRAGMAS['busy_timeout'], (
+        'Убедитесь, что при подключении к SQLite применяются настройки '
+        'из `BLOG_SQLITE_PRAGMAS`.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dbmaintain_runs(capsys):
+    call_command('dbmaintain')
+    output = capsys.readouterr().out
+    assert 'ANALYZE' in output
+    assert 'PRAGMA optimize' in output
+
+
+@pytest.mark.django_db(transaction=True)
+def test_new_connection_pragmas_are_not_counted(
+        client, post_with_published_location
+):
+    connection.ensure_connection()
+    previous = connection.connection
+    connection.connection = None
+    try:
+        response = client.get(reverse('blog:index'))
+        new_connection = connection.connection
+    finally:
+        connection.connection = previous
+    assert new_connection is not None and new_connection is not previous
+    new_connection.close()
+    assert 'desc="3 queries"' in response['Server-Timing'], (
+        'Убедитесь, что настройки SQLite, применяемые при открытии '
+        'соединения, не учитываются в числе SQL-запросов запроса.'
+    )
@@ -0,0 +1,51 @@
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+def test_server_timing_header(client, post_with_published_location):
+    response = client.get(reverse('blog:index'))
+    header = response.get('Server-Timing', '')
+    for metric in ('total;dur=', 'view;dur=', 'db;dur=', 'tpl;dur=',
+                   'tpl-includes-post_card.html;dur=',
+                   'tpl-includes-paginator.html;dur='):
+        assert metric in header, (
+            f'Убедитесь, что заголовок `Server-Timing` содержит `{metric}`.'
+        )
+    assert 'desc="3 queries"' in header
+
+
+def test_server_timing_can_be_disabled(
+        client, post_with_published_location, settings
+):
+    settings.BLOG_SERVER_TIMING = False
+    response = client.get(reverse('blog:index'))
+    assert not response.has_header('Server-Timing')
+
+
+def test_request_timing_is_logged(
+        client, post_with_published_location, caplog
+):
+    with caplog.at_level(logging.INFO, logger='blog.timing'):
+        client.get(
+            reverse('blog:post_detail',
+                    kwargs={'pk': post_with_published_location.pk})
+        )
+    records = [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name == 'blog.timing'
+    ]
+    assert len(records) == 1, (
+        'Убедитесь, что на каждый запрос в журнал `blog.timing` '
+        'записывается одна строка.'
+    )
+    record = records[0]
+    assert record['view'] == 'blog:post_detail'
+    assert record['status'] == 200
+    assert record['db_queries'] > 0
+    assert record['template_ms'] > 0
+    assert record['includes']['includes/comments.html']['count'] == 1
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.utils.timezone import now
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def mixed_posts(
+        posts_with_unpublished_category,
+        future_posts,
+        unpublished_posts_with_published_locations,
+        post_with_published_location,
+        post_of_another_author,
+):
+    return post_with_published_location, post_of_another_author
+
+
+def test_visible_matches_inline_filters(PostModel, mixed_posts):
+    inline = PostModel.objects.filter(
+        pub_date__lte=now(),
+        is_published=True,
+        category__is_published=True
+    )
+    assert set(PostModel.objects.visible()) == set(inline) == set(
+        mixed_posts
+    ), (
+        'Убедитесь, что `Post.objects.visible()` возвращает только '
+        'опубликованные посты опубликованных категорий с датой публикации '
+        'в прошлом.'
+    )
+
+
+def test_visible_to_author_includes_hidden_posts(
+        PostModel, user, another_user, mixed_posts
+):
+    assert set(PostModel.objects.visible_to(AnonymousUser())) == set(
+        PostModel.objects.visible()
+    )
+    assert set(PostModel.objects.visible_to(user)) == set(
+        PostModel.objects.all()
+    ), 'Убедитесь, что автор видит все свои публикации.'
+    assert set(PostModel.objects.visible_to(another_user)) == set(
+        PostModel.objects.visible()
+    )
+
+
+def test_hidden_post_visible_only_to_author(
+        client, user_client, another_user_client, future_posts
+):
+    url = f'/posts/{future_posts[0].id}/'
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404
+    assert client.get(url).status_code == 404
+
+
+def test_category_publication_updates_visibility(
+        PostModel, published_category, post_with_published_location
+):
+    published_category.is_published = False
+    published_category.save()
+    assert not PostModel.objects.visible().exists(), (
+        'Убедитесь, что снятие категории с публикации скрывает её посты '
+        'из ленты.'
+    )
+    published_category.is_published = True
+    published_category.save()
+    assert list(PostModel.objects.visible()) == [
+        post_with_published_location
+    ]
+
+
+def test_publish_scheduled_shows_due_posts(PostModel, future_posts):
+    PostModel.objects.filter(pk=future_posts[0].pk).update(
+        pub_date=now() - timedelta(minutes=1)
+    )
+    assert not PostModel.objects.visible().exists()
+    call_command('publish_scheduled')
+    assert list(PostModel.objects.visible()) == [future_posts[0]], (
+        'Убедитесь, что команда `publish_scheduled` показывает в ленте '
+        'отложенные публикации, время которых наступило.'
+    )